@@ -0,0 +1,145 @@
+"""Attendance report rollups.
+
+Groups a date range of attendance by employee, department, day or week
+and counts present/absent/late marks per group in SQL, so a report is
+one row per group instead of one row per attendance mark. Per-employee
+groups count the attendance rows; the others sum the daily rollup (see
+attendance_rollup.py), a few rows per day whatever the headcount.
+"""
+from sqlalchemy import Date, case, cast, func, select
+
+from columnar import columns_from_rows
+from database import SQLALCHEMY_DATABASE_URL, is_sqlite
+from model import Attendance, DailyAttendanceRollup, Department, Employee
+
+REPORT_GROUPS = ["employee", "department", "day", "week"]
+ATTENDANCE_STATUSES = ["present", "absent", "late"]
+REPORT_COUNTS = [*ATTENDANCE_STATUSES, "total"]
+
+EMPLOYEE_NAME = (Employee.first_name + " " + Employee.last_name).label("employee_name")
+
+
+def week_start(day):
+    """Monday of the week `day` falls in"""
+    if is_sqlite(SQLALCHEMY_DATABASE_URL):
+        # 'weekday 0' moves forward to Sunday (or stays on one), six days back is Monday
+        return func.date(day, "weekday 0", "-6 days", type_=Date)
+    return cast(func.date_trunc("week", day), Date)
+
+
+def _employee_report(start_date, end_date, department_id=None):
+    keys = [Attendance.employee_id, EMPLOYEE_NAME, Employee.department_id]
+    stmt = select(
+        *keys,
+        *[func.sum(case((Attendance.status == s, 1), else_=0)).label(s) for s in ATTENDANCE_STATUSES],
+        func.count().label("total")
+    ).join(
+        Employee, Employee.employee_id == Attendance.employee_id
+    ).where(
+        Attendance.work_day >= start_date,
+        Attendance.work_day <= end_date
+    )
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    return stmt.group_by(*keys).order_by(*keys)
+
+
+def report_query(group_by: str, start_date, end_date, department_id=None):
+    """One row per group with its key columns and present/absent/late/total counts"""
+    if group_by == "employee":
+        return _employee_report(start_date, end_date, department_id)
+    rollup = DailyAttendanceRollup
+    if group_by == "department":
+        keys = [rollup.department_id, Department.department_name]
+    elif group_by == "day":
+        keys = [rollup.day.label("date")]
+    else:
+        keys = [week_start(rollup.day).label("week_start")]
+    stmt = select(
+        *keys,
+        *[func.sum(case((rollup.status == s, rollup.count), else_=0)).label(s) for s in ATTENDANCE_STATUSES],
+        func.sum(rollup.count).label("total")
+    ).where(
+        rollup.day >= start_date,
+        rollup.day <= end_date
+    )
+    if group_by == "department":
+        stmt = stmt.outerjoin(Department, Department.id == rollup.department_id)
+    if department_id is not None:
+        stmt = stmt.where(rollup.department_id == department_id)
+    # groups whose marks were all changed to another status sum to zero
+    return stmt.group_by(*keys).having(func.sum(rollup.count) > 0).order_by(*keys)
+
+
+def marks_query(start_date, end_date, department_id=None):
+    """Individual marks in the range with employee name and department (group_by=none), unordered"""
+    stmt = select(
+        Attendance.id, Attendance.employee_id, EMPLOYEE_NAME,
+        Employee.department_id, Attendance.work_day, Attendance.status
+    ).join(
+        Employee, Attendance.employee_id == Employee.employee_id
+    ).where(
+        Attendance.work_day >= start_date,
+        Attendance.work_day <= end_date
+    )
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    return stmt
+
+
+def with_rates(counts: dict) -> dict:
+    """Add present_rate/absent_rate/late_rate (share of total, 0 when empty)"""
+    total = counts["total"]
+    for s in ATTENDANCE_STATUSES:
+        counts[f"{s}_rate"] = round(counts[s] / total, 4) if total else 0.0
+    return counts
+
+
+def group_rows(group_by: str, rows) -> list:
+    groups = []
+    for row in rows:
+        group = {s: int(getattr(row, s) or 0) for s in ATTENDANCE_STATUSES}
+        group["total"] = row.total
+        if group_by == "employee":
+            key = {
+                "employee_id": row.employee_id,
+                "employee_name": row.employee_name,
+                "department_id": row.department_id,
+            }
+        elif group_by == "department":
+            # the rollup files employees without a department under 0
+            key = {"department_id": row.department_id or None, "department_name": row.department_name}
+        elif group_by == "day":
+            key = {"date": row.date.isoformat()}
+        else:
+            key = {"week_start": row.week_start.isoformat()}
+        groups.append(with_rates({**key, **group}))
+    return groups
+
+
+def summarize(groups: list) -> dict:
+    return with_rates({
+        key: sum(group[key] for group in groups)
+        for key in REPORT_COUNTS
+    })
+
+
+def group_columns(group_by: str, result, department_names: dict) -> tuple:
+    """The groups of a report_query() result as columns (see columnar.py), their summary and count"""
+    names = list(result.keys())
+    rows = result.all()
+    if group_by == "employee":
+        columns = columns_from_rows(rows, names, ["department_id"], {"department_id": department_names})
+    else:
+        columns = columns_from_rows(rows, names)
+    if group_by == "department":
+        columns["department_id"] = [department_id or None for department_id in columns["department_id"]]
+    for s in ATTENDANCE_STATUSES:
+        columns[s] = [int(count or 0) for count in columns[s]]
+    summary = with_rates({key: sum(columns[key]) for key in REPORT_COUNTS})
+    for s in ATTENDANCE_STATUSES:
+        columns[f"{s}_rate"] = [
+            round(count / total, 4) if total else 0.0
+            for count, total in zip(columns[s], columns["total"])
+        ]
+    return columns, summary, len(rows)
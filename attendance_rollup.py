@@ -0,0 +1,64 @@
+"""Daily attendance rollup.
+
+daily_attendance_rollup holds the number of attendance marks per
+(day, department, status). Attendance writes adjust it in the same
+transaction as the marks, so day, week and department reports and the
+dashboard's present count read a handful of rows per day instead of
+scanning attendance. A mark counts under the department its employee was
+in when it was written; rebuild() recounts everything from attendance
+using the current departments.
+"""
+from collections import Counter
+
+from sqlalchemy import delete, func, insert, select
+
+from database import batched_upsert
+from model import Attendance, DailyAttendanceRollup, Employee
+
+NO_DEPARTMENT = 0
+
+
+def _upserts(counts: dict):
+    """INSERT ... ON CONFLICT statements adding `counts` {(day, department_id, status): delta}"""
+    table = DailyAttendanceRollup.__table__
+    rows = [
+        {"day": day, "department_id": department_id, "status": mark, "count": delta}
+        for (day, department_id, mark), delta in counts.items()
+    ]
+    return batched_upsert(
+        table, rows, [table.c.day, table.c.department_id, table.c.status],
+        lambda excluded: {"count": table.c.count + excluded.count}
+    )
+
+
+async def apply_marks(db, day, changes):
+    """Count written marks, given as (department_id, previous status or None, new status).
+
+    The deltas are added in the database (count = count + excluded.count)
+    and never read back, so concurrent writers add up. The previous
+    statuses must have been read with the marks locked, as
+    upsert_attendance does. The caller commits.
+    """
+    deltas = Counter()
+    for department_id, previous, mark in changes:
+        if previous == mark:
+            continue
+        department_id = department_id if department_id is not None else NO_DEPARTMENT
+        if previous is not None:
+            deltas[(day, department_id, previous)] -= 1
+        deltas[(day, department_id, mark)] += 1
+    for stmt in _upserts({key: delta for key, delta in deltas.items() if delta}):
+        await db.execute(stmt)
+
+
+def rebuild(conn):
+    """Recount the whole rollup from attendance (sync connection)"""
+    table = DailyAttendanceRollup.__table__
+    conn.execute(delete(table))
+    department_id = func.coalesce(Employee.department_id, NO_DEPARTMENT)
+    conn.execute(insert(table).from_select(
+        ["day", "department_id", "status", "count"],
+        select(Attendance.work_day, department_id, Attendance.status, func.count()).join(
+            Employee, Employee.employee_id == Attendance.employee_id
+        ).group_by(Attendance.work_day, department_id, Attendance.status)
+    ))
@@ -0,0 +1,210 @@
+"""Serialization throughput of the list endpoints, before and after orjson.
+
+    python bench_serialization.py [--rows 1000] [--repeat 20] > bench_output.txt
+
+Builds payloads shaped like /admin/all_employees and
+/admin/attendance_report (group_by=employee) and times three ways of
+turning them into a response body:
+
+  jsonable_encoder + json    what a route without response_model did
+                             (FastAPI's default JSONResponse)
+  response_model + orjson    what the routes do now: pydantic-core
+                             validates and dumps to JSON-able python,
+                             ORJSONResponse renders it
+  response_model dump_json   pydantic-core straight to bytes, as the
+                             response cache does on a miss
+
+It then compares a page of raw attendance marks (group_by=none) built
+as row dicts against format=columnar (see columnar.py): time, body size
+and peak memory allocated while building and rendering.
+
+No database is needed; the payloads are synthetic.
+"""
+import argparse
+import functools
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from attendance_report import summarize, with_rates
+from columnar import columnar_response, columns_from_rows
+from model import AttendanceReport, EmployeePage
+
+
+def employee_page(rows: int) -> dict:
+    created = datetime(2025, 1, 1, 9, 30)
+    return {
+        "items": [
+            {
+                "id": i,
+                "employee_id": f"E{i:05d}",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "email": f"employee{i}@ems.com",
+                "phone": "555-0100",
+                "role": "employee",
+                "is_active": i % 10 != 0,
+                "department_id": i % 12 + 1,
+                "address": f"{i} Main Street",
+                "date_of_birth": date(1990, 1, 1) + timedelta(days=i),
+                "salary": 1000.0 + i,
+                "created_at": created + timedelta(minutes=i),
+                "updated_at": created + timedelta(minutes=i),
+            }
+            for i in range(1, rows + 1)
+        ],
+        "next_cursor": "WyJpZCIsIFsxMDAwXV0",
+        "limit": rows,
+    }
+
+
+def attendance_report(rows: int) -> dict:
+    groups = [
+        with_rates({
+            "employee_id": f"E{i:05d}",
+            "employee_name": f"First{i} Last{i}",
+            "department_id": i % 12 + 1,
+            "present": 18 + i % 3,
+            "absent": i % 2,
+            "late": i % 4,
+            "total": 18 + i % 3 + i % 2 + i % 4,
+        })
+        for i in range(1, rows + 1)
+    ]
+    return {
+        "start_date": "2026-09-18",
+        "end_date": "2026-10-18",
+        "group_by": "employee",
+        "summary": summarize(groups),
+        "groups": groups,
+    }
+
+
+# built once per model, as FastAPI does per route
+adapter_for = functools.lru_cache(TypeAdapter)
+
+
+def attendance_marks(rows: int) -> list:
+    """Row tuples as the group_by=none query returns them"""
+    statuses = ["present", "present", "present", "late", "absent"]
+    return [
+        (rows - i, f"E{i % 200:05d}", f"First{i % 200} Last{i % 200}", i % 12 + 1,
+         date(2026, 10, 18) - timedelta(days=i // 200), statuses[i % 5])
+        for i in range(rows)
+    ]
+
+
+MARK_COLUMNS = ["id", "employee_id", "employee_name", "department_id", "date", "status"]
+DEPARTMENT_NAMES = {department_id: f"Department {department_id}" for department_id in range(1, 13)}
+
+
+def marks_as_rows(marks):
+    # as the endpoint builds them
+    items = [
+        {"id": i, "employee_id": e, "employee_name": name, "department_id": d, "date": day.isoformat(), "status": mark}
+        for i, e, name, d, day, mark in marks
+    ]
+    content = {"start_date": "2026-09-18", "end_date": "2026-10-18", "group_by": "none",
+               "items": items, "next_cursor": None, "limit": len(items)}
+    return after(content, AttendanceReport, True)
+
+
+def marks_as_columns(marks):
+    columns = columns_from_rows(
+        marks, MARK_COLUMNS, ["employee_id", "department_id", "status"],
+        {"employee_id": "employee_name", "department_id": DEPARTMENT_NAMES}
+    )
+    return columnar_response(
+        columns, len(marks), start_date="2026-09-18", end_date="2026-10-18", group_by="none",
+        next_cursor=None, limit=len(marks)
+    ).body
+
+
+def peak_allocated(build, marks) -> int:
+    tracemalloc.start()
+    try:
+        build(marks)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def before(content, model, exclude_unset):
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(content, model, exclude_unset):
+    adapter = adapter_for(model)
+    value = adapter.validate_python(content, from_attributes=True)
+    return ORJSONResponse(adapter.dump_python(value, mode="json", exclude_unset=exclude_unset)).body
+
+
+def after_bytes(content, model, exclude_unset):
+    adapter = adapter_for(model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True), exclude_unset=exclude_unset)
+
+
+METHODS = [
+    ("jsonable_encoder + json", before),
+    ("response_model + orjson", after),
+    ("response_model dump_json", after_bytes),
+]
+
+
+def measure(serialize, content, model, exclude_unset, repeat: int):
+    """Best time of `repeat` runs, and the body size"""
+    body = serialize(content, model, exclude_unset)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(content, model, exclude_unset)
+        best = min(best, time.perf_counter() - started)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="rows per payload")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per method (best is kept)")
+    args = parser.parse_args()
+
+    payloads = [
+        ("all_employees", employee_page(args.rows), EmployeePage, True),
+        ("attendance_report", attendance_report(args.rows), AttendanceReport, True),
+    ]
+    for name, content, model, exclude_unset in payloads:
+        print(f"{name}: {args.rows} rows, best of {args.repeat}")
+        baseline = None
+        for label, serialize in METHODS:
+            seconds, size = measure(serialize, content, model, exclude_unset, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"  {label:<26} {seconds * 1000:8.2f} ms  {args.rows / seconds:>10,.0f} rows/s"
+                f"  {size / seconds / 2**20:7.1f} MB/s  x{baseline / seconds:.2f}"
+            )
+        print()
+
+    marks = attendance_marks(args.rows)
+    print(f"attendance marks, json rows vs columnar: {args.rows} rows, best of {args.repeat}")
+    baseline = None
+    for label, build in [("rows (response_model)", marks_as_rows), ("columnar", marks_as_columns)]:
+        body = build(marks)
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            build(marks)
+            best = min(best, time.perf_counter() - started)
+        peak = peak_allocated(build, marks)
+        baseline = baseline or (best, len(body), peak)
+        print(
+            f"  {label:<26} {best * 1000:8.2f} ms  {len(body):>10,} bytes  {peak / 2**10:>8,.0f} KiB peak"
+            f"  x{baseline[0] / best:.2f} time  x{baseline[1] / len(body):.2f} size  x{baseline[2] / peak:.2f} memory"
+        )
+
+
+if __name__ == "__main__":
+    main()
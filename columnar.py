@@ -0,0 +1,67 @@
+"""Column-oriented payloads for large tabular responses (format=columnar).
+
+Instead of one object per row, repeating every key, a columnar payload
+has one array per column:
+
+    {"format": "columnar", "rows": 3, "columns": {
+        "id": [7, 6, 5],
+        "status": {"dictionary": ["late", "present"], "indices": [0, 1, 1]},
+        "department_id": {"dictionary": [2], "labels": ["Eng"], "indices": [0, 0, 0]}
+    }}
+
+Low-cardinality columns (statuses, departments, ...) are dictionary
+encoded: the distinct values once, then an index per row. A dictionary
+column may carry "labels" (e.g. department names) in dictionary order.
+Payloads are built by transposing the row tuples a query returns, so no
+per-row dict is created; dates are left to orjson to render.
+"""
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+
+RESPONSE_FORMATS = ["json", "columnar"]
+
+
+def check_response_format(response_format: str) -> None:
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(RESPONSE_FORMATS)}"
+        )
+
+
+def dictionary(values, labels: dict = None) -> dict:
+    """Dictionary-encode a column, with labels[value] for each distinct value if given"""
+    index = {}
+    indices = [index.setdefault(value, len(index)) for value in values]
+    column = {"dictionary": list(index)}
+    if labels is not None:
+        column["labels"] = [labels.get(value) for value in index]
+    column["indices"] = indices
+    return column
+
+
+def columns_from_rows(rows, names: list, encode=(), labels: dict = None) -> dict:
+    """{name: values} from row tuples in `names` order.
+
+    Columns in `encode` are dictionary-encoded. `labels` maps an encoded
+    column to {value: label}, or to the name of another column holding
+    the labels, which is then folded into it. Names missing from `names`
+    are ignored, so sparse fieldsets can share one spec.
+    """
+    labels = labels or {}
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    columns = {name: list(column) for name, column in zip(names, values)}
+    for name in encode:
+        if name not in columns:
+            continue
+        source = labels.get(name)
+        if isinstance(source, str):
+            # one label per value; the last row seen wins
+            source = dict(zip(columns[name], columns.pop(source))) if source in columns else None
+        columns[name] = dictionary(columns[name], source)
+    return columns
+
+
+def columnar_response(columns: dict, rows: int, **extra) -> ORJSONResponse:
+    """ORJSONResponse for `columns` (see columns_from_rows) plus `extra` top-level keys (cursor, summary, ...)"""
+    return ORJSONResponse({"format": "columnar", **extra, "rows": rows, "columns": columns})
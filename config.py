@@ -0,0 +1,93 @@
+import os
+
+# Runtime settings, overridable through environment variables
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.lower() not in ("0", "false", "no", "off")
+
+
+# Password hashing executor
+# "thread" is enough for bcrypt (the C extension releases the GIL),
+# "process" isolates hashing from the web worker entirely.
+HASH_EXECUTOR = os.getenv("EMS_HASH_EXECUTOR", "thread").lower()
+HASH_POOL_SIZE = _env_int("EMS_HASH_POOL_SIZE", min(4, os.cpu_count() or 1))
+HASH_QUEUE_SIZE = _env_int("EMS_HASH_QUEUE_SIZE", 64)
+HASH_RETRY_AFTER = _env_int("EMS_HASH_RETRY_AFTER", 2)  # seconds
+
+# Authenticated principal cache (per process)
+PRINCIPAL_CACHE_SIZE = _env_int("EMS_PRINCIPAL_CACHE_SIZE", 10000)
+PRINCIPAL_CACHE_TTL = _env_int("EMS_PRINCIPAL_CACHE_TTL", 300)  # seconds
+
+# Database access mode: "async" uses AsyncEngine/AsyncSession,
+# "sync" keeps the blocking Session path (for side-by-side benchmarks).
+DB_MODE = os.getenv("EMS_DB_MODE", "async").lower()
+
+# Database engine
+DATABASE_URL = os.getenv("EMS_DATABASE_URL", "sqlite:///./ems.db")
+
+# PostgreSQL pool
+DB_POOL_SIZE = _env_int("EMS_DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("EMS_DB_MAX_OVERFLOW", 20)
+DB_POOL_PRE_PING = _env_bool("EMS_DB_POOL_PRE_PING", True)
+DB_POOL_RECYCLE = _env_int("EMS_DB_POOL_RECYCLE", 1800)  # seconds
+DB_STATEMENT_TIMEOUT_MS = _env_int("EMS_DB_STATEMENT_TIMEOUT_MS", 30000)
+
+# SQLite pragmas, applied on every new connection
+SQLITE_JOURNAL_MODE = os.getenv("EMS_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("EMS_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = _env_int("EMS_SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_MMAP_SIZE = _env_int("EMS_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)  # bytes
+SQLITE_CACHE_SIZE = _env_int("EMS_SQLITE_CACHE_SIZE", -64000)  # negative = KiB
+SQLITE_FOREIGN_KEYS = _env_bool("EMS_SQLITE_FOREIGN_KEYS", True)
+
+# Bulk attendance marking: rows accepted per request
+ATTENDANCE_BULK_MAX = _env_int("EMS_ATTENDANCE_BULK_MAX", 5000)
+
+# Payroll deduction rules (defaults, a payroll run can override them)
+# A day's pay is basic / working days; 0 working days means the
+# weekdays of the payroll month.
+PAYROLL_WORKING_DAYS = _env_int("EMS_PAYROLL_WORKING_DAYS", 0)
+PAYROLL_ABSENT_DAY_RATE = _env_float("EMS_PAYROLL_ABSENT_DAY_RATE", 1.0)  # days of pay per absence
+PAYROLL_UNPAID_LEAVE_DAY_RATE = _env_float("EMS_PAYROLL_UNPAID_LEAVE_DAY_RATE", 1.0)  # days of pay per unpaid leave day
+PAYROLL_LATE_GRACE = _env_int("EMS_PAYROLL_LATE_GRACE", 2)  # late marks per month without penalty
+PAYROLL_LATE_PENALTY = _env_float("EMS_PAYROLL_LATE_PENALTY", 0.25)  # days of pay per late mark past the grace
+PAYROLL_DEDUCTION_CAP = _env_float("EMS_PAYROLL_DEDUCTION_CAP", 1.0)  # max attendance deduction, share of basic
+
+# Admin dashboard counters: reconciled with the database in the
+# background; a read past the TTL reloads them itself (0 disables the task)
+DASHBOARD_STATS_RECONCILE = _env_int("EMS_DASHBOARD_STATS_RECONCILE", 60)  # seconds
+DASHBOARD_STATS_TTL = _env_int("EMS_DASHBOARD_STATS_TTL", 120)  # seconds
+
+# Annual leave entitlement in days (new leave ledger rows start with it)
+LEAVE_ANNUAL_DAYS = _env_int("EMS_LEAVE_ANNUAL_DAYS", 30)
+
+# Department catalog and headcounts (per process), dropped whenever this
+# process commits a department or employee change; the TTL bounds how
+# long changes made by other workers go unseen
+DEPARTMENT_CACHE_TTL = _env_int("EMS_DEPARTMENT_CACHE_TTL", 300)  # seconds
+
+# Response cache for admin list endpoints (per process, 0 disables it).
+# Entries are checked against per-table version counters kept in the
+# backend: "memory" (this process only) or "sqlite", a local file shared
+# by every worker on the machine so a write in one invalidates all.
+# Whatever the backend, an entry is never served past the TTL, which
+# bounds how long writes made by other workers go unseen with "memory"
+# (0 lifts the bound; only do that with a shared backend)
+RESPONSE_CACHE_BYTES = _env_int("EMS_RESPONSE_CACHE_BYTES", 32 * 1024 * 1024)
+RESPONSE_CACHE_TTL = _env_int("EMS_RESPONSE_CACHE_TTL", 60)  # seconds
+RESPONSE_CACHE_BACKEND = os.getenv("EMS_RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_STORE = os.getenv("EMS_RESPONSE_CACHE_STORE", "./ems_cache_versions.db")
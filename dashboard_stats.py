@@ -0,0 +1,117 @@
+"""Admin dashboard counters kept in memory.
+
+The counters are loaded from the database with one query, then kept
+current by the write paths (record() on the request session, applied
+once the transaction commits). A background task reconciles them with
+the database every DASHBOARD_STATS_RECONCILE seconds. Reads past
+DASHBOARD_STATS_TTL reload on the spot, which bounds drift from writes
+made outside this process (other workers, scripts, manual SQL).
+"""
+import asyncio
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+import config
+from database import open_session
+from model import DailyAttendanceRollup, Department, Employee, Leave
+
+COUNTERS = ("total_employees", "total_departments", "today_attendance", "pending_leaves")
+
+
+def _count(model, *where):
+    return select(func.count()).select_from(model).where(*where).scalar_subquery()
+
+
+class DashboardStats:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Optional[dict] = None
+        self._day: Optional[date] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _fresh(self) -> bool:
+        return (
+            self._values is not None
+            and self._day == date.today()
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def reload(self, db) -> dict:
+        """Read all counters from the database in one query"""
+        today = date.today()
+        row = (await db.execute(select(
+            _count(Employee),
+            _count(Department),
+            select(func.coalesce(func.sum(DailyAttendanceRollup.count), 0)).where(
+                DailyAttendanceRollup.day == today,
+                DailyAttendanceRollup.status == "present"
+            ).scalar_subquery(),
+            _count(Leave, Leave.status == "pending"),
+        ))).one()
+        values = dict(zip(COUNTERS, row))
+        with self._lock:
+            self._values = values
+            self._day = today
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+        return dict(values)
+
+    async def get(self, db) -> dict:
+        with self._lock:
+            if self._fresh():
+                return dict(self._values)
+        return await self.reload(db)
+
+    def apply(self, deltas: dict):
+        with self._lock:
+            if self._values is None:
+                return
+            for (name, day), delta in deltas.items():
+                # attendance deltas only count toward the day being shown
+                if day is not None and day != self._day:
+                    continue
+                self._values[name] += delta
+
+    def clear(self):
+        with self._lock:
+            self._values = None
+
+
+dashboard_stats = DashboardStats(ttl=config.DASHBOARD_STATS_TTL)
+
+
+def record(db, name: str, delta: int, day: Optional[date] = None):
+    """Adjust a counter once the session's transaction commits"""
+    if delta:
+        deltas = db.info.setdefault("dashboard_deltas", {})
+        deltas[(name, day)] = deltas.get((name, day), 0) + delta
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    deltas = session.info.pop("dashboard_deltas", None)
+    if deltas:
+        dashboard_stats.apply(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("dashboard_deltas", None)
+
+
+async def reconcile_periodically(interval: float):
+    """Reload the counters from the database every `interval` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with open_session() as db:
+                await dashboard_stats.reload(db)
+        except Exception as e:
+            print(f"Dashboard stats reconcile failed: {e}")
@@ -1,18 +1,212 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Database URL - using SQLite for simplicity
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ems.db"
+import config
+
+def normalize_url(url: str) -> str:
+    # Heroku-style "postgres://" URLs are not accepted by SQLAlchemy
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    raise ValueError(f"No async driver configured for '{dialect}'")
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Engine keyword arguments for the configured backend"""
+    if is_sqlite(url):
+        options = {}
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    # PostgreSQL
+    timeout = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if is_async:
+        connect_args = {"server_settings": {"statement_timeout": timeout}}
+    else:
+        connect_args = {"options": f"-c statement_timeout={timeout}"}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; busy_timeout makes
+    # writers wait for the lock instead of failing with "database is locked".
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA foreign_keys={'ON' if config.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    cursor.close()
+
+
+SQLALCHEMY_DATABASE_URL = normalize_url(config.DATABASE_URL)
+
+
+def dialect_insert(table):
+    """INSERT for the configured backend, with on_conflict_do_update/do_nothing"""
+    if is_sqlite(SQLALCHEMY_DATABASE_URL):
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+# rows per INSERT statement, keeps the bound parameters under SQLite's limit
+INSERT_BATCH_ROWS = 1000
+
+
+def batched_upsert(table, rows: list, index_elements, set_=None):
+    """INSERT ... ON CONFLICT statements writing `rows`, INSERT_BATCH_ROWS per statement.
+
+    set_(excluded) returns the DO UPDATE assignments, given the
+    statement's excluded row; without it conflicting rows are left alone.
+    """
+    for start in range(0, len(rows), INSERT_BATCH_ROWS):
+        stmt = dialect_insert(table).values(rows[start:start + INSERT_BATCH_ROWS])
+        if set_ is None:
+            yield stmt.on_conflict_do_nothing(index_elements=index_elements)
+        else:
+            yield stmt.on_conflict_do_update(index_elements=index_elements, set_=set_(stmt.excluded))
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+if is_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (only created in async mode, so a backend without an
+# async driver still works with EMS_DB_MODE=sync)
+ASYNC_DATABASE_URL = None
+async_engine = None
+AsyncSessionLocal = None
+if config.DB_MODE == "async":
+    ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True)
+    )
+    if is_sqlite(ASYNC_DATABASE_URL):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+class SyncSessionAdapter:
+    """Exposes a blocking Session through the AsyncSession interface.
+
+    Used in "sync" mode so routers can be written once against the async
+    API. Every call still runs on the event loop, exactly like before.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return self.sync_session.execute(statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return self.sync_session.scalar(statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return self.sync_session.scalars(statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        return SyncResultAdapter(self.sync_session.execute(statement, params, **kwargs))
+
+    async def get(self, entity, ident, **kwargs):
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        self.sync_session.delete(instance)
+
+    async def flush(self, objects=None):
+        self.sync_session.flush(objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        self.sync_session.refresh(instance, attribute_names)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+    async def close(self):
+        self.sync_session.close()
+
+
+class SyncResultAdapter:
+    """The partitions() part of AsyncResult over a sync Result (see stream())"""
+
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size=None):
+        for partition in self.result.partitions(size):
+            yield partition
+
+
+@asynccontextmanager
+async def open_session():
+    """Open a session for the configured DB_MODE"""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        session = SessionLocal()
+        try:
+            yield SyncSessionAdapter(session)
+        finally:
+            session.close()
+
+
+async def get_db():
+    """Request-scoped session dependency.
+
+    Every dependency in a request that asks for get_db (including the
+    auth dependencies) receives the same session, so a request checks out
+    one connection and shares one identity map.
+    """
+    async with open_session() as db:
+        yield db
+
+
 # Create Base class
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -0,0 +1,117 @@
+"""Attendance- and leave-aware payroll deductions.
+
+Per-employee absence, late and unpaid leave counts for a month come from
+two grouped queries. The deduction itself is array math over those
+counts, so thousands of employees cost the same two queries and a few
+vector operations.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, func, select
+
+from model import Attendance, DeductionRules, Leave
+
+# above this many employees the month is aggregated for everyone rather
+# than sending a huge IN list
+IN_LIST_LIMIT = 1000
+
+
+def validate_rules(rules: DeductionRules) -> None:
+    rates = (rules.absent_day_rate, rules.unpaid_leave_day_rate, rules.late_penalty)
+    if rules.working_days < 0 or rules.late_grace < 0 or min(rates) < 0 or not 0 <= rules.cap <= 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Deduction rules must not be negative and cap must be between 0 and 1"
+        )
+
+
+def month_bounds(month: str):
+    """First day of a 'YYYY-MM' month and first day of the next one"""
+    start = date.fromisoformat(f"{month}-01")
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def working_days(month: str, rules: DeductionRules) -> int:
+    if rules.working_days > 0:
+        return rules.working_days
+    start, end = month_bounds(month)
+    return int(np.busday_count(start, end))
+
+
+async def month_counts(db, employee_ids: list, month: str) -> dict:
+    """absent, late and unpaid_leave_days arrays aligned with employee_ids"""
+    start, end = month_bounds(month)
+    index = {employee_id: i for i, employee_id in enumerate(employee_ids)}
+    absent = np.zeros(len(employee_ids))
+    late = np.zeros(len(employee_ids))
+    unpaid = np.zeros(len(employee_ids))
+
+    # an absence on a day covered by approved leave is not charged again
+    on_leave = select(Leave.id).where(
+        Leave.employee_id == Attendance.employee_id,
+        Leave.status == "approved",
+        Leave.start_date <= Attendance.work_day,
+        Leave.end_date >= Attendance.work_day
+    ).exists()
+    attendance_stmt = select(
+        Attendance.employee_id,
+        func.sum(case((and_(Attendance.status == "absent", ~on_leave), 1), else_=0)),
+        func.sum(case((Attendance.status == "late", 1), else_=0))
+    ).where(
+        Attendance.work_day >= start,
+        Attendance.work_day < end
+    ).group_by(Attendance.employee_id)
+
+    leave_stmt = select(Leave.employee_id, Leave.start_date, Leave.end_date).where(
+        Leave.status == "approved",
+        Leave.leave_type == "unpaid",
+        Leave.start_date < end,
+        Leave.end_date >= start
+    )
+    if len(employee_ids) <= IN_LIST_LIMIT:
+        attendance_stmt = attendance_stmt.where(Attendance.employee_id.in_(employee_ids))
+        leave_stmt = leave_stmt.where(Leave.employee_id.in_(employee_ids))
+
+    for employee_id, absent_count, late_count in await db.execute(attendance_stmt):
+        i = index.get(employee_id)
+        if i is not None:
+            absent[i] = absent_count
+            late[i] = late_count
+
+    leaves = [
+        (index[employee_id], start_date, end_date)
+        for employee_id, start_date, end_date in await db.execute(leave_stmt)
+        if employee_id in index
+    ]
+    if leaves:
+        positions, starts, ends = zip(*leaves)
+        # clip each leave to the month and count its weekdays
+        starts = np.maximum(np.array(starts, dtype="datetime64[D]"), np.datetime64(start))
+        ends = np.minimum(np.array(ends, dtype="datetime64[D]") + 1, np.datetime64(end))
+        np.add.at(unpaid, np.array(positions), np.busday_count(starts, ends))
+
+    return {"absent": absent, "late": late, "unpaid_leave_days": unpaid}
+
+
+def attendance_deductions(basic: np.ndarray, counts: dict, rules: DeductionRules, days: int) -> np.ndarray:
+    """Prorated deduction per employee, capped at rules.cap of basic pay"""
+    charged_days = (
+        counts["absent"] * rules.absent_day_rate
+        + counts["unpaid_leave_days"] * rules.unpaid_leave_day_rate
+        + np.maximum(counts["late"] - rules.late_grace, 0) * rules.late_penalty
+    )
+    return np.round(np.minimum(basic / days * charged_days, basic * rules.cap), 2)
+
+
+async def compute_deductions(db, employee_ids: list, basic: np.ndarray, month: str, rules: DeductionRules = None):
+    """Attendance deductions for `employee_ids` (with matching basic pay) in a month.
+
+    Returns (amounts, counts) where counts holds the per-employee arrays
+    the amounts were computed from.
+    """
+    rules = rules or DeductionRules()
+    validate_rules(rules)
+    counts = await month_counts(db, employee_ids, month)
+    return attendance_deductions(basic, counts, rules, working_days(month, rules)), counts
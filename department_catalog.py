@@ -0,0 +1,189 @@
+"""In-process department catalog.
+
+Departments change rarely and are looked up on almost every admin
+request (employee creation, department pages, bulk attendance, payroll
+scopes), so the whole table is kept in memory indexed by id and by name,
+along with the employee headcount per department. Both are dropped when
+this process commits a change to a department, or to an employee's
+department or active flag, and reloaded on the next read.
+"""
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+import config
+from model import Department, Employee
+
+
+class DepartmentRecord(NamedTuple):
+    id: int
+    department_name: str
+    description: Optional[str]
+
+
+class DepartmentCatalog:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._by_id: Optional[dict] = None
+        self._by_name: Optional[dict] = None
+        self._headcount: Optional[list] = None
+        self._loaded_at = 0.0
+        self._headcount_loaded_at = 0.0
+        # bumped on every invalidation so a load that raced with one is not kept
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    async def _departments(self, db) -> dict:
+        with self._lock:
+            if self._by_id is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._by_id
+            generation = self._generation
+        return await self._reload(db, generation)
+
+    async def _reload(self, db, generation: int) -> dict:
+        rows = await db.execute(
+            select(Department.id, Department.department_name, Department.description).order_by(Department.id)
+        )
+        by_id = {row.id: DepartmentRecord(*row) for row in rows}
+        with self._lock:
+            self.loads += 1
+            if generation == self._generation:
+                self._by_id = by_id
+                self._by_name = {record.department_name: record for record in by_id.values()}
+                self._loaded_at = time.monotonic()
+        return by_id
+
+    async def all(self, db) -> list:
+        return list((await self._departments(db)).values())
+
+    async def names(self, db) -> dict:
+        """{department id: name}, e.g. labels for a columnar department column"""
+        return {department_id: record.department_name for department_id, record in (await self._departments(db)).items()}
+
+    async def by_id(self, db, department_id: int) -> Optional[DepartmentRecord]:
+        record = (await self._departments(db)).get(department_id)
+        if record is None:
+            # may have been created by another worker since the last load
+            record = await self._lookup(db, Department.id == department_id)
+        return record
+
+    async def by_name(self, db, name: str) -> Optional[DepartmentRecord]:
+        await self._departments(db)
+        with self._lock:
+            record = self._by_name.get(name) if self._by_name is not None else None
+        if record is None:
+            record = await self._lookup(db, Department.department_name == name)
+        return record
+
+    async def _lookup(self, db, criterion) -> Optional[DepartmentRecord]:
+        """One department fetched by its primary or unique key, added to the catalog if found"""
+        with self._lock:
+            generation = self._generation
+        row = (await db.execute(
+            select(Department.id, Department.department_name, Department.description).where(criterion)
+        )).first()
+        if row is None:
+            return None
+        record = DepartmentRecord(*row)
+        with self._lock:
+            if generation == self._generation and self._by_id is not None:
+                # replaced rather than updated: readers may be iterating the old dicts
+                self._by_id = {**self._by_id, record.id: record}
+                self._by_name = {**self._by_name, record.department_name: record}
+        return record
+
+    async def find(self, db, department_id: Optional[int] = None, name: Optional[str] = None) -> Optional[DepartmentRecord]:
+        """Look a department up by id if given, otherwise by name"""
+        if department_id is not None:
+            return await self.by_id(db, department_id)
+        return await self.by_name(db, name)
+
+    async def headcount(self, db) -> list:
+        """Employees (total and active) per department, from one GROUP BY"""
+        with self._lock:
+            if self._headcount is not None and time.monotonic() - self._headcount_loaded_at < self.ttl:
+                return self._headcount
+            generation = self._generation
+        counts = {
+            department_id: (total, active)
+            for department_id, total, active in await db.execute(select(
+                Employee.department_id,
+                func.count(),
+                func.sum(case((Employee.is_active == True, 1), else_=0))
+            ).group_by(Employee.department_id))
+        }
+        headcount = [
+            {
+                "department_id": record.id,
+                "department_name": record.department_name,
+                "employees": counts.get(record.id, (0, 0))[0],
+                "active_employees": int(counts.get(record.id, (0, 0))[1] or 0),
+            }
+            for record in await self.all(db)
+        ]
+        with self._lock:
+            if generation == self._generation:
+                self._headcount = headcount
+                self._headcount_loaded_at = time.monotonic()
+        return headcount
+
+    def invalidate(self, departments: bool = True):
+        """Drop the headcounts, and with departments=True the catalog too"""
+        with self._lock:
+            self._generation += 1
+            self._headcount = None
+            if departments:
+                self._by_id = None
+                self._by_name = None
+
+
+department_catalog = DepartmentCatalog(ttl=config.DEPARTMENT_CACHE_TTL)
+
+
+# Invalidation: note what a flush changed and drop it once the
+# transaction commits (as principals.py does for the principal cache).
+_HEADCOUNT_FIELDS = ("department_id", "is_active")
+
+
+def _mark(target, key: str):
+    session = object_session(target)
+    if session is not None:
+        session.info[key] = True
+
+
+@event.listens_for(Department, "after_insert")
+@event.listens_for(Department, "after_update")
+@event.listens_for(Department, "after_delete")
+def _department_changed(mapper, connection, target):
+    _mark(target, "departments_changed")
+
+
+@event.listens_for(Employee, "after_insert")
+@event.listens_for(Employee, "after_delete")
+def _employee_added_or_removed(mapper, connection, target):
+    _mark(target, "headcount_changed")
+
+
+@event.listens_for(Employee, "after_update")
+def _employee_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _HEADCOUNT_FIELDS):
+        _mark(target, "headcount_changed")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    departments = session.info.pop("departments_changed", False)
+    headcount = session.info.pop("headcount_changed", False)
+    if departments or headcount:
+        department_catalog.invalidate(departments=departments)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("departments_changed", None)
+    session.info.pop("headcount_changed", None)
@@ -0,0 +1,76 @@
+"""Conditional GET for the self-service endpoints.
+
+An employee's ETag for a table is derived from two write counters kept
+in the change_versions table: "<table>:<employee_id>", bumped by every
+transaction that wrote that employee's rows, and "<table>:*", bumped by
+writes whose employees are unknown. The counters are incremented inside
+the writing transaction itself, so they commit or roll back with the
+data and every worker sees the same ETag. Checking If-None-Match costs
+one primary key lookup instead of loading the rows.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from model import ChangeVersion
+from response_cache import written_tables
+
+# tables served with ETags; writes to the others are not counted
+TRACKED_TABLES = {"employees", "leaves", "salaries"}
+
+# browsers keep the body but revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_names(employee_id: str, *tables: str) -> list:
+    return [name for table in tables for name in (f"{table}:*", f"{table}:{employee_id}")]
+
+
+def versions_query(names: list):
+    return select(ChangeVersion.name, ChangeVersion.version).where(ChangeVersion.name.in_(names))
+
+
+async def employee_etag(db, employee_id: str, *tables: str) -> str:
+    names = version_names(employee_id, *tables)
+    versions = dict((await db.execute(versions_query(names))).all())
+    state = repr((employee_id, [(name, versions.get(name, 0)) for name in names]))
+    return '"%s"' % hashlib.sha256(state.encode()).hexdigest()[:32]
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client's If-None-Match already names `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    # weak comparison, as RFC 9110 asks for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def tagged(content: BaseModel, etag: str) -> Response:
+    return Response(content.model_dump_json(), media_type="application/json", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # flush first so that changes still pending are noted too
+    session.flush()
+    names = sorted(
+        name for name in written_tables(session)
+        if ":" in name and name.partition(":")[0] in TRACKED_TABLES
+    )
+    if not names:
+        return
+    stmt = dialect_insert(ChangeVersion).values([{"name": name, "version": 1} for name in names])
+    # a plain Connection.execute, so this write is not noted itself
+    session.connection().execute(stmt.on_conflict_do_update(
+        index_elements=[ChangeVersion.name],
+        set_={"version": ChangeVersion.version + 1}
+    ))
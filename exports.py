@@ -0,0 +1,98 @@
+"""Streaming CSV / NDJSON exports.
+
+Rows are read through a server-side cursor EXPORT_BATCH_ROWS at a time
+(yield_per / stream_results) and encoded batch by batch, so an export
+holds one batch in memory however many rows it covers. With gzip the
+encoded batches go through one compressor and the download is a .gz
+file.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from database import open_session
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# rows fetched from the cursor and encoded per chunk
+EXPORT_BATCH_ROWS = 1000
+
+
+def check_format(export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode_csv(columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def encode(rows) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    # header row
+    return encode([columns]), encode
+
+
+def _encode_ndjson(columns):
+    def encode(rows) -> str:
+        return "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_value, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+    return "", encode
+
+
+async def _chunks(statement, columns, export_format: str):
+    header, encode = (_encode_csv if export_format == "csv" else _encode_ndjson)(columns)
+    if header:
+        yield header.encode()
+    # the request's session may be closed before the body is sent, so the
+    # export reads through its own
+    async with open_session() as db:
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        async for rows in result.partitions():
+            yield encode(rows).encode()
+
+
+async def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(statement, columns: list, export_format: str, filename: str, gzip: bool = False):
+    """StreamingResponse with the rows of `statement` (tuples in `columns` order) as a file download"""
+    check_format(export_format)
+    chunks = _chunks(statement, columns, export_format)
+    media_type = EXPORT_FORMATS[export_format]
+    filename = f"{filename}.{export_format}"
+    if gzip:
+        chunks = _gzipped(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+import config
+
+
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Executed inside the pool. Kept at module level so they can be pickled
+# when the process executor is used. time.time() is used for the wait
+# measurement because perf_counter is not comparable across processes.
+def _hash(enqueued_at: float, password: str):
+    return time.time() - enqueued_at, bcrypt_context.hash(password)
+
+
+def _verify(enqueued_at: float, password: str, hashed: str):
+    return time.time() - enqueued_at, bcrypt_context.verify(password, hashed)
+
+
+class HashingService:
+    """Runs bcrypt on a bounded worker pool so it never blocks the event loop."""
+
+    def __init__(self, executor: str, pool_size: int, queue_size: int, retry_after: int):
+        self.executor_kind = executor
+        self.pool_size = max(1, pool_size)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # metrics
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            # pool_size jobs are running, everything above that is queued
+            if self._in_flight >= self.pool_size + self.queue_size:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": str(self.retry_after)}
+                )
+            self._in_flight += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            waited, result = await loop.run_in_executor(
+                self._get_executor(), fn, time.time(), *args
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        with self._lock:
+            self._completed += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(_verify, password, hashed)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "executor": self.executor_kind,
+                "pool_size": self.pool_size,
+                "queue_capacity": self.queue_size,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.pool_size),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / self._completed * 1000, 2) if self._completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2)
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher = HashingService(
+    executor=config.HASH_EXECUTOR,
+    pool_size=config.HASH_POOL_SIZE,
+    queue_size=config.HASH_QUEUE_SIZE,
+    retry_after=config.HASH_RETRY_AFTER
+)
+
+
+async def hash_password(password: str) -> str:
+    return await hasher.hash(password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await hasher.verify(password, hashed)
@@ -0,0 +1,57 @@
+"""Per-employee, per-year leave ledger.
+
+A leave counts toward the year it starts in with all of its days
+(end_date - start_date + 1), the rule the employee dashboard applied
+when it summed approved leaves on every request. Leaves only move from
+pending to approved or rejected, so approving is the one change that
+touches the ledger.
+"""
+from collections import Counter
+
+from sqlalchemy import func, select, update
+
+from database import batched_upsert
+from model import Leave, LeaveLedger
+
+
+def leave_days(start_date, end_date) -> int:
+    return (end_date - start_date).days + 1
+
+
+def _totals(leaves) -> Counter:
+    totals = Counter()
+    for employee_id, start_date, end_date in leaves:
+        totals[(employee_id, start_date.year)] += leave_days(start_date, end_date)
+    return totals
+
+
+def _upserts(totals, replace: bool = False):
+    """INSERT ... ON CONFLICT statements adding (or with replace, setting) used days"""
+    table = LeaveLedger.__table__
+    rows = [
+        {"employee_id": employee_id, "year": year, "used_days": days}
+        for (employee_id, year), days in totals.items()
+    ]
+
+    def used(excluded):
+        days = excluded.used_days if replace else table.c.used_days + excluded.used_days
+        return {"used_days": days, "updated_at": func.now()}
+
+    return batched_upsert(table, rows, [table.c.employee_id, table.c.year], used)
+
+
+async def add_approved(db, leaves):
+    """Count newly approved leaves, given as (employee_id, start_date, end_date). The caller commits."""
+    for stmt in _upserts(_totals(leaves)):
+        await db.execute(stmt)
+
+
+def rebuild(conn):
+    """Recompute every ledger row from the approved leaves (sync connection)"""
+    totals = _totals(conn.execute(
+        select(Leave.employee_id, Leave.start_date, Leave.end_date).where(Leave.status == "approved")
+    ))
+    # years whose approved leaves are gone drop back to zero
+    conn.execute(update(LeaveLedger.__table__).values(used_days=0))
+    for stmt in _upserts(totals, replace=True):
+        conn.execute(stmt)
@@ -1,26 +1,28 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from router import auth, Admin, employee, settings
-from database import engine, Base, SessionLocal
-from model import Employee,Department
-from router.auth import bcrypt_context
+from database import engine, SessionLocal, async_engine
+from migrations import run_migrations
+from model import Employee,Department,MessageResponse
 from contextlib import asynccontextmanager
-from passlib.context import CryptContext
+from hashing import hash_password, hasher
+from dashboard_stats import reconcile_periodically
+import asyncio
+import config
 
 
-pwd_context = CryptContext(schemes=["bcrypt"])
-
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def get_password_hash(password: str):
+    return await hash_password(password)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting lifespan")
     # 🔹 STARTUP CODE
-    print("Creating tables")
-    Base.metadata.create_all(bind=engine)
-    print("Tables created")
+    print("Running migrations")
+    run_migrations(engine)
+    print("Migrations applied")
     
     db = SessionLocal()
     print("DB session created")
@@ -54,7 +56,7 @@ async def lifespan(app: FastAPI):
                 first_name="System",
                 last_name="Admin",
                 email="admin@ems.com",
-                password_hash=get_password_hash("admin123"),
+                password_hash=await get_password_hash("admin123"),
                 role="admin",
                 department_id=admin_dept.id,
                 is_active=True
@@ -69,12 +71,27 @@ async def lifespan(app: FastAPI):
         db.close()
         print("DB closed")
 
+    # keep the dashboard counters in line with writes made elsewhere
+    reconcile_task = None
+    if config.DASHBOARD_STATS_RECONCILE > 0:
+        reconcile_task = asyncio.create_task(
+            reconcile_periodically(config.DASHBOARD_STATS_RECONCILE)
+        )
+
     yield   # 🔹 APP RUNS HERE
 
     # 🔹 SHUTDOWN CODE (optional)
     print("Application shutting down")
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+    hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
 
-app = FastAPI(lifespan=lifespan)
+# orjson renders every JSON response; routes validate and dump through
+# their pydantic response_model first
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
@@ -92,6 +109,6 @@ app.include_router(Admin.router)
 app.include_router(employee.router)
 app.include_router(settings.router)
 
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
 async def read_root():
     return {"message": "Welcome to the FastAPI application!"}
@@ -0,0 +1,357 @@
+"""Versioned schema migrations.
+
+Applied in order at startup (main.lifespan) and recorded in the
+schema_migrations table. Each migration runs in its own transaction and
+must be safe on a database that create_all already brought up to date,
+because the baseline migration creates the current model.
+
+    python migrations.py              apply pending migrations
+    python migrations.py status       list applied / pending versions
+    python migrations.py check-plans  fail if a hot query scans a table (SQLite)
+    python migrations.py rebuild-leave-ledger
+                                      recompute the leave ledger from approved leaves
+    python migrations.py rebuild-attendance-rollup
+                                      recount the daily attendance rollup from attendance
+"""
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, cast, func, inspect, select, text, update
+
+import attendance_rollup
+import leave_ledger
+from database import Base, engine
+from model import Attendance, ChangeVersion, DailyAttendanceRollup, Department, Employee, Leave, LeaveLedger, Salary
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def applied_versions(bind=engine):
+    with bind.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(bind=engine):
+    """Apply every pending migration, oldest first"""
+    done = applied_versions(bind)
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+        print(f"Applying migration {version}: {description}")
+        with bind.begin() as conn:
+            fn(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description, "applied_at": datetime.utcnow()}
+            )
+
+
+def _create_indexes(conn, *models):
+    for model in models:
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# migrations
+
+@migration(1, "baseline schema")
+def _baseline(conn):
+    Base.metadata.create_all(bind=conn)
+
+
+_DERIVED_COLUMNS = {
+    "attendance": {"work_day": "date(date)"},
+}
+
+
+def _rebuild_table(conn, model):
+    """Recreate a SQLite table from the current model, keeping its rows.
+
+    SQLite cannot alter constraints, so the table is renamed, created
+    again and refilled.
+    """
+    table = model.__table__
+    inspector = inspect(conn)
+    old_name = f"_{table.name}_old"
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {old_name}"))
+    # index names are global in SQLite, drop the old ones before recreating
+    old_indexes = conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": old_name}).scalars().all()
+    for index_name in old_indexes:
+        conn.execute(text(f"DROP INDEX {index_name}"))
+    table.create(conn)
+    old_columns = [
+        column["name"] for column in inspector.get_columns(old_name)
+        if column["name"] in table.columns
+    ]
+    targets, sources = list(old_columns), list(old_columns)
+    # columns added to the model later, derived from the old data
+    for name, expression in _DERIVED_COLUMNS.get(table.name, {}).items():
+        if name not in old_columns:
+            targets.append(name)
+            sources.append(expression)
+    # OR REPLACE: rows are copied oldest first, so the latest one wins
+    # if the new table has a unique constraint the old one lacked
+    conn.execute(text(
+        f"INSERT OR REPLACE INTO {table.name} ({', '.join(targets)}) "
+        f"SELECT {', '.join(sources)} FROM {old_name} ORDER BY id"
+    ))
+    conn.execute(text(f"DROP TABLE {old_name}"))
+
+
+@migration(2, "point employee_id foreign keys at employees.employee_id")
+def _fix_employee_foreign_keys(conn):
+    # Databases created before the FK fix reference employees.id, which
+    # rejects every row once SQLite enforces foreign keys.
+    if conn.dialect.name != "sqlite":
+        return
+    inspector = inspect(conn)
+    for model in (Attendance, Leave, Salary):
+        stale = any(
+            fk["referred_table"] == "employees" and fk["referred_columns"] == ["id"]
+            for fk in inspector.get_foreign_keys(model.__table__.name)
+        )
+        if stale:
+            _rebuild_table(conn, model)
+
+
+# as they were when migration 3 was written: the model has moved on since
+# (attendance now indexes work_day, which only migration 4 adds)
+_HOT_PATH_INDEXES = [
+    ("ix_employees_department_id", "employees", ["department_id"], False),
+    ("ix_attendance_employee_date", "attendance", ["employee_id", "date"], False),
+    ("ix_attendance_status_date", "attendance", ["status", "date"], False),
+    ("ix_leaves_employee_status_start", "leaves", ["employee_id", "status", "start_date"], False),
+    ("ix_leaves_status_start", "leaves", ["status", "start_date"], False),
+    ("ux_salaries_employee_month", "salaries", ["employee_id", "month"], True),
+]
+
+
+@migration(3, "indexes for attendance, leave and salary hot paths")
+def _hot_path_indexes(conn):
+    for name, table, columns, unique in _HOT_PATH_INDEXES:
+        conn.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+        ))
+
+
+@migration(4, "stored attendance work_day with unique (employee_id, work_day)")
+def _attendance_work_day(conn):
+    table = Attendance.__table__
+    columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    if "work_day" not in columns:
+        conn.execute(text("ALTER TABLE attendance ADD COLUMN work_day DATE"))
+
+    # SQLite stores timestamps as text, CAST(... AS DATE) would make a number
+    if conn.dialect.name == "sqlite":
+        day = func.date(table.c.date)
+    else:
+        day = cast(table.c.date, Date)
+    conn.execute(update(table).where(table.c.work_day.is_(None)).values(work_day=day))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE attendance ALTER COLUMN work_day SET NOT NULL"))
+
+    # keep the latest mark when a day was recorded more than once
+    conn.execute(text(
+        "DELETE FROM attendance WHERE id NOT IN "
+        "(SELECT MAX(id) FROM attendance GROUP BY employee_id, work_day)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_attendance_employee_date"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_attendance_status_date"))
+    _create_indexes(conn, Attendance)
+
+
+@migration(5, "sort indexes for paginated salary and leave listings")
+def _listing_sort_indexes(conn):
+    _create_indexes(conn, Salary, Leave)
+
+
+@migration(6, "drop the leaves start_date >= CURRENT_DATE check")
+def _drop_leave_start_date_check(conn):
+    # the CHECK was re-evaluated on UPDATE, so a leave could not be
+    # approved or rejected once its start date had passed
+    if conn.dialect.name == "sqlite":
+        sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'leaves'"
+        )).scalar()
+        if sql and "CURRENT_DATE" in sql:
+            _rebuild_table(conn, Leave)
+    else:
+        conn.execute(text("ALTER TABLE leaves DROP CONSTRAINT IF EXISTS check_start_date_not_past"))
+
+
+@migration(7, "leave ledger table, backfilled from approved leaves")
+def _leave_ledger(conn):
+    LeaveLedger.__table__.create(conn, checkfirst=True)
+    leave_ledger.rebuild(conn)
+
+
+@migration(8, "daily attendance rollup table, backfilled from attendance")
+def _daily_attendance_rollup(conn):
+    DailyAttendanceRollup.__table__.create(conn, checkfirst=True)
+    attendance_rollup.rebuild(conn)
+
+
+@migration(9, "change version counters for the self-service ETags")
+def _change_versions(conn):
+    ChangeVersion.__table__.create(conn, checkfirst=True)
+
+
+# query plan check
+
+def hot_queries():
+    """Representative statements for the request hot paths"""
+    today = date.today()
+    month_start = today.replace(day=1)
+    return [
+        ("attendance of employee today", select(Attendance).where(
+            Attendance.employee_id == "EMP001",
+            Attendance.work_day == today
+        )),
+        ("present today", select(func.count()).select_from(Attendance).where(
+            Attendance.work_day == today,
+            Attendance.status == "present"
+        )),
+        ("attendance report range", select(Attendance).where(
+            Attendance.work_day >= today - timedelta(days=30),
+            Attendance.work_day <= today
+        ).order_by(Attendance.work_day.desc())),
+        ("employee monthly attendance", select(func.count()).select_from(Attendance).where(
+            Attendance.employee_id == "EMP001",
+            Attendance.work_day >= month_start,
+            Attendance.work_day < (month_start + timedelta(days=32)).replace(day=1),
+            Attendance.status == "present"
+        )),
+        ("pending leave queue", select(func.count()).select_from(Leave).where(
+            Leave.status == "pending"
+        )),
+        ("overlapping leaves", select(Leave).where(
+            Leave.employee_id == "EMP001",
+            Leave.status.in_(["pending", "approved"]),
+            Leave.start_date <= today,
+            Leave.end_date >= today
+        )),
+        ("employee leaves", select(Leave).where(Leave.employee_id == "EMP001")),
+        ("approved leaves of year", select(Leave).where(
+            Leave.employee_id == "EMP001",
+            Leave.status == "approved",
+            Leave.start_date >= date(today.year, 1, 1),
+            Leave.start_date <= date(today.year, 12, 31)
+        )),
+        ("salary of month", select(Salary).where(
+            Salary.employee_id == "EMP001",
+            Salary.month == today.strftime("%Y-%m")
+        )),
+        ("latest salary", select(Salary).where(
+            Salary.employee_id == "EMP001"
+        ).order_by(Salary.month.desc()).limit(1)),
+        ("department employees", select(Employee).where(Employee.department_id == 1)),
+        ("salaries page by month", select(Salary).where(
+            Salary.month >= "2026-01"
+        ).order_by(Salary.month, Salary.id).limit(101)),
+        ("salary history of employees", select(
+            Salary.month,
+            func.row_number().over(partition_by=Salary.employee_id, order_by=Salary.month.desc())
+        ).where(Salary.employee_id.in_(["EMP001", "EMP002"]))),
+        ("leaves page by start date", select(Leave).where(
+            Leave.start_date >= today
+        ).order_by(Leave.start_date, Leave.id).limit(101)),
+        ("pending leave queue page", select(Leave.id, Employee.first_name, Department.department_name).join(
+            Employee, Employee.employee_id == Leave.employee_id
+        ).outerjoin(Department, Department.id == Employee.department_id).where(
+            Leave.status == "pending"
+        ).order_by(Leave.start_date, Leave.id).limit(101)),
+        ("department by name", select(Department).where(Department.department_name == "Administration")),
+        ("attendance report page", select(Attendance.id, Employee.first_name).join(
+            Employee, Employee.employee_id == Attendance.employee_id
+        ).where(
+            Attendance.work_day >= today - timedelta(days=30),
+            Attendance.work_day <= today
+        ).order_by(Attendance.work_day.desc(), Attendance.id.desc()).limit(101)),
+        ("attendance rollup by day", select(DailyAttendanceRollup.day, func.sum(DailyAttendanceRollup.count)).where(
+            DailyAttendanceRollup.day >= today - timedelta(days=365),
+            DailyAttendanceRollup.day <= today
+        ).group_by(DailyAttendanceRollup.day)),
+        ("rollup present today", select(func.sum(DailyAttendanceRollup.count)).where(
+            DailyAttendanceRollup.day == today,
+            DailyAttendanceRollup.status == "present"
+        )),
+        ("leave ledger of year", select(LeaveLedger.used_days).where(
+            LeaveLedger.employee_id == "EMP001",
+            LeaveLedger.year == today.year
+        )),
+    ]
+
+
+def table_scans(conn, queries=None):
+    """Return (query name, plan detail) for every query (default: hot_queries()) that scans a whole table"""
+    scans = []
+    for name, statement in hot_queries() if queries is None else queries:
+        sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+            detail = row[-1]
+            # "SCAN t" is a full table scan; "SCAN t USING INDEX" walks an index
+            # "SCAN (subquery-N)" reads an already filtered intermediate result and
+            # "SCAN CONSTANT ROW" is a SELECT without FROM (scalar subqueries only)
+            if detail.startswith("SCAN") and "USING" not in detail and not detail.startswith(("SCAN (subquery", "SCAN CONSTANT ROW")):
+                scans.append((name, detail))
+    return scans
+
+
+def check_query_plans(bind=engine) -> bool:
+    if bind.dialect.name != "sqlite":
+        print("EXPLAIN QUERY PLAN check only runs against SQLite")
+        return True
+    with bind.connect() as conn:
+        scans = table_scans(conn)
+    for name, detail in scans:
+        print(f"TABLE SCAN in '{name}': {detail}")
+    if not scans:
+        print(f"All {len(hot_queries())} hot queries use an index")
+    return not scans
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command == "migrate":
+        run_migrations()
+    elif command == "status":
+        done = applied_versions()
+        for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+            print(f"{version:>4}  {'applied' if version in done else 'pending':8} {description}")
+    elif command == "check-plans":
+        run_migrations()
+        sys.exit(0 if check_query_plans() else 1)
+    elif command == "rebuild-leave-ledger":
+        run_migrations()
+        with engine.begin() as conn:
+            leave_ledger.rebuild(conn)
+        print("Leave ledger rebuilt")
+    elif command == "rebuild-attendance-rollup":
+        run_migrations()
+        with engine.begin() as conn:
+            attendance_rollup.rebuild(conn)
+        print("Attendance rollup rebuilt")
+    else:
+        print(__doc__)
+        sys.exit(2)
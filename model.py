@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Date, Float, Text, Boolean, ForeignKey, DateTime, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, Float, Text, Boolean, ForeignKey, DateTime, CheckConstraint, Index
 from sqlalchemy.sql import func
 from database import Base
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 from sqlalchemy.orm import relationship
+import config
 
 class Employee(Base):
     __tablename__ = "employees"
@@ -31,6 +32,10 @@ class Employee(Base):
     leaves = relationship("Leave", back_populates="employee")
     salaries = relationship("Salary", back_populates="employee")
     
+    __table_args__ = (
+        Index("ix_employees_department_id", "department_id"),
+    )
+    
     def __repr__(self):
         return f"<Employee(id={self.id}, employee_id={self.employee_id}, first_name={self.first_name}, last_name={self.last_name}, role={self.role})>"
 
@@ -52,17 +57,29 @@ class Department(Base):
         return f"<Department(id={self.id}, name={self.department_name})>"
     
     
+def _default_work_day(context):
+    # Derive the work day from an explicit timestamp, otherwise today
+    timestamp = context.get_current_parameters().get("date")
+    return timestamp.date() if isinstance(timestamp, datetime) else date.today()
+
+
 class Attendance(Base):
     __tablename__ = "attendance"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(String(50), ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(String(50), ForeignKey("employees.employee_id"), nullable=False)
     date = Column(DateTime, default=func.now(), nullable=False)
+    work_day = Column(Date, default=_default_work_day, nullable=False)  # stored so day filters can use an index
     status = Column(String(20), nullable=False)  # e.g., 'present', 'absent', 'late'
     
     # Relationship
     employee = relationship("Employee", back_populates="attendances")
 
+    __table_args__ = (
+        Index("ux_attendance_employee_work_day", "employee_id", "work_day", unique=True),
+        Index("ix_attendance_work_day_status", "work_day", "status"),
+    )
+
     def __repr__(self):
         return f"<Attendance(id={self.id}, employee_id={self.employee_id}, date={self.date}, status={self.status})>"
 
@@ -71,7 +88,7 @@ class Leave(Base):
     __tablename__ = "leaves"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(String(50), ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(String(50), ForeignKey("employees.employee_id"), nullable=False)
     leave_type = Column(String(50), nullable=False)  # e.g., 'annual', 'sick', 'personal'
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
@@ -81,10 +98,14 @@ class Leave(Base):
     # Relationship
     employee = relationship("Employee", back_populates="leaves")
 
-    # Constraint to ensure end_date is not before start_date and start_date is not before current date
+    # Constraint to ensure end_date is not before start_date. "Not in the past"
+    # is checked when applying (employee.apply_leave): as a CHECK it was
+    # re-evaluated on every UPDATE and blocked deciding leaves that had started.
     __table_args__ = (
         CheckConstraint('end_date >= start_date', name='check_end_date_after_start'),
-        CheckConstraint('start_date >= CURRENT_DATE', name='check_start_date_not_past'),
+        Index("ix_leaves_employee_status_start", "employee_id", "status", "start_date"),
+        Index("ix_leaves_status_start", "status", "start_date"),
+        Index("ix_leaves_start_date_id", "start_date", "id"),
     )
 
     def __repr__(self):
@@ -95,7 +116,7 @@ class Salary(Base):
     __tablename__ = "salaries"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(String(50), ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(String(50), ForeignKey("employees.employee_id"), nullable=False)
     month = Column(String(7), nullable=False)  # Format: 'YYYY-MM'
     basic_salary = Column(Float, nullable=False)
     deduction = Column(Float, default=0.0, nullable=False)
@@ -104,10 +125,58 @@ class Salary(Base):
     # Relationship
     employee = relationship("Employee", back_populates="salaries")
 
+    __table_args__ = (
+        Index("ux_salaries_employee_month", "employee_id", "month", unique=True),
+        Index("ix_salaries_month_id", "month", "id"),
+    )
+
     def __repr__(self):
         return f"<Salary(id={self.id}, employee_id={self.employee_id}, month={self.month}, net_salary={self.net_salary})>"
 
 
+class LeaveLedger(Base):
+    """Approved leave days per employee and year, maintained when leaves are decided"""
+    __tablename__ = "leave_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(String(50), ForeignKey("employees.employee_id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    entitled_days = Column(Integer, default=config.LEAVE_ANNUAL_DAYS, nullable=False)
+    used_days = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ux_leave_ledger_employee_year", "employee_id", "year", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<LeaveLedger(employee_id={self.employee_id}, year={self.year}, used_days={self.used_days})>"
+
+
+class DailyAttendanceRollup(Base):
+    """Attendance marks counted per day, department and status, maintained on every attendance write"""
+    __tablename__ = "daily_attendance_rollup"
+
+    day = Column(Date, primary_key=True)
+    department_id = Column(Integer, primary_key=True)  # 0 for employees without a department
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyAttendanceRollup(day={self.day}, department_id={self.department_id}, status={self.status}, count={self.count})>"
+
+
+class ChangeVersion(Base):
+    """Write counters behind the self-service ETags, bumped in the writing transaction (see etags.py)"""
+    __tablename__ = "change_versions"
+
+    name = Column(String(120), primary_key=True)  # "<table>:<employee_id>" or "<table>:*"
+    version = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ChangeVersion(name={self.name}, version={self.version})>"
+
+
 class EmployeeCreate(BaseModel):
     employee_id: str
     first_name: str
@@ -147,18 +216,75 @@ class EmployeeResponse(BaseModel):
     address: Optional[str]
     date_of_birth: Optional[date]
     salary: Optional[float]
-    created_at: Optional[str]
-    updated_at: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
     
     class Config:
         from_attributes = True
 
 
+class EmployeeListItem(BaseModel):
+    # every field is optional so a sparse fieldset (fields=...) validates;
+    # listings are returned with response_model_exclude_unset
+    id: Optional[int] = None
+    employee_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+    department_id: Optional[int] = None
+    address: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    salary: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class EmployeePage(BaseModel):
+    items: list[EmployeeListItem]
+    next_cursor: Optional[str]
+    limit: int
+
+
+class EmployeeCreated(BaseModel):
+    message: str
+    employee_id: int
+
+
+class ProfileResponse(BaseModel):
+    id: int
+    employee_id: str
+    first_name: str
+    last_name: str
+    email: str
+    phone: Optional[str]
+    address: Optional[str]
+    role: str
+    is_active: bool
+    salary: Optional[float]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 class AttendanceCreate(BaseModel):
     employee_id: str
     status: str
 
 
+class AttendanceBulkCreate(BaseModel):
+    # explicit rows, and/or a default status for a whole department;
+    # explicit rows win over the department default
+    records: list[AttendanceCreate] = []
+    department_name: Optional[str] = None
+    department_id: Optional[int] = None
+    default_status: Optional[str] = None
+
+
 class AttendanceResponse(BaseModel):
     id: int
     employee_id: str
@@ -169,6 +295,74 @@ class AttendanceResponse(BaseModel):
         from_attributes = True
 
 
+class AttendanceMarked(BaseModel):
+    message: str
+    attendance_id: int
+    status: str
+
+
+class AttendanceMarkResult(BaseModel):
+    employee_id: str
+    status: str
+    result: str  # recorded, updated or failed
+    attendance_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class AttendanceBulkResult(BaseModel):
+    work_day: date
+    recorded: int
+    updated: int
+    failed: int
+    results: list[AttendanceMarkResult]
+
+
+class AttendanceCounts(BaseModel):
+    present: int
+    absent: int
+    late: int
+    total: int
+    present_rate: float
+    absent_rate: float
+    late_rate: float
+
+
+class AttendanceGroupKey(BaseModel):
+    # which fields are set depends on group_by; returned with response_model_exclude_unset
+    employee_id: Optional[str] = None
+    employee_name: Optional[str] = None
+    department_id: Optional[int] = None
+    department_name: Optional[str] = None
+    date: Optional[str] = None
+    week_start: Optional[str] = None
+
+
+class AttendanceGroup(AttendanceCounts, AttendanceGroupKey):
+    # key fields first, then the counts
+    pass
+
+
+class AttendanceRecord(BaseModel):
+    id: int
+    employee_id: str
+    employee_name: str
+    department_id: Optional[int]
+    date: str
+    status: str
+
+
+class AttendanceReport(BaseModel):
+    # summary/groups when grouped, items/next_cursor/limit for group_by=none
+    start_date: str
+    end_date: str
+    group_by: str
+    summary: Optional[AttendanceCounts] = None
+    groups: Optional[list[AttendanceGroup]] = None
+    items: Optional[list[AttendanceRecord]] = None
+    next_cursor: Optional[str] = None
+    limit: Optional[int] = None
+
+
 class LeaveCreate(BaseModel):
     employee_id: str
     leave_type: str
@@ -190,6 +384,70 @@ class LeaveResponse(BaseModel):
         from_attributes = True
 
 
+class LeaveListItem(LeaveResponse):
+    first_name: str
+    last_name: str
+    department_id: Optional[int]
+    department_name: Optional[str]
+
+
+class LeavePage(BaseModel):
+    items: list[LeaveListItem]
+    next_cursor: Optional[str]
+    limit: int
+    counts: Optional[dict[str, int]] = None  # only with include_counts
+
+
+class LeaveApplied(BaseModel):
+    message: str
+    leave_id: int
+    status: str
+    leave_type: str
+    start_date: date
+    end_date: date
+    number_of_days: int
+
+
+class MyLeaveItem(BaseModel):
+    id: int
+    leave_type: str
+    start_date: date
+    end_date: date
+    status: str
+    reason: Optional[str]
+
+    @computed_field
+    @property
+    def days(self) -> int:
+        return (self.end_date - self.start_date).days + 1
+
+    class Config:
+        from_attributes = True
+
+
+class MyLeaves(BaseModel):
+    employee_id: str
+    total_applications: int
+    leaves: list[MyLeaveItem]
+
+
+class LeaveDecision(BaseModel):
+    leave_ids: list[int]
+    decision: str  # approve or reject
+
+
+class LeaveUnchanged(BaseModel):
+    id: int
+    status: Optional[str]  # None when the leave does not exist
+    detail: Optional[str] = None
+
+
+class LeaveDecisionResult(BaseModel):
+    status: str
+    changed: list[int]
+    unchanged: list[LeaveUnchanged]
+
+
 class SalaryCreate(BaseModel):
     employee_id: str
     month: str
@@ -209,6 +467,187 @@ class SalaryResponse(BaseModel):
         from_attributes = True
 
 
+class SalaryPage(BaseModel):
+    items: list[SalaryResponse]
+    next_cursor: Optional[str]
+    limit: int
+
+
+class MySalaries(BaseModel):
+    employee_id: str
+    total_salaries: int
+    salaries: list[SalaryResponse]
+
+
+class SalaryAdded(BaseModel):
+    message: str
+    salary_id: int
+    deduction: float
+    attendance_deduction: float
+    net_salary: float
+
+
+class SalaryHistoryItem(BaseModel):
+    employee_id: str
+    first_name: str
+    last_name: str
+    salaries: list[list[str | float]]  # rows in the order of SalaryHistoryPage.columns
+
+
+class SalaryHistoryPage(BaseModel):
+    columns: list[str]
+    items: list[SalaryHistoryItem]
+    next_cursor: Optional[str]
+    limit: int
+
+
+class DeductionRules(BaseModel):
+    # attendance / unpaid leave deduction rules, see deductions.py
+    working_days: int = config.PAYROLL_WORKING_DAYS  # 0 = weekdays of the month
+    absent_day_rate: float = config.PAYROLL_ABSENT_DAY_RATE
+    unpaid_leave_day_rate: float = config.PAYROLL_UNPAID_LEAVE_DAY_RATE
+    late_grace: int = config.PAYROLL_LATE_GRACE
+    late_penalty: float = config.PAYROLL_LATE_PENALTY
+    cap: float = config.PAYROLL_DEDUCTION_CAP
+
+
+class PayrollRun(BaseModel):
+    month: str  # 'YYYY-MM'
+    scope: str = "all"  # all, department, employees
+    department_name: Optional[str] = None
+    department_id: Optional[int] = None
+    employee_ids: list[str] = []
+    deduction: float = 0.0  # flat amount per employee
+    deduction_rate: float = 0.0  # share of basic salary
+    apply_attendance: bool = True  # add absence, late and unpaid leave deductions
+    rules: Optional[DeductionRules] = None  # defaults from config
+    on_existing: str = "skip"  # skip or update rows already written for the month
+    dry_run: bool = False
+
+
+class PayrollSkip(BaseModel):
+    employee_id: str
+    reason: str
+
+
+class PayrollTotals(BaseModel):
+    basic_salary: float
+    attendance_deduction: float
+    deduction: float
+    net_salary: float
+
+
+class PayrollLine(BaseModel):
+    employee_id: str
+    basic_salary: float
+    deduction: float
+    net_salary: float
+    attendance_deduction: float
+    # only when attendance deductions were applied
+    absent_days: Optional[int] = None
+    late_marks: Optional[int] = None
+    unpaid_leave_days: Optional[int] = None
+
+
+class PayrollResult(BaseModel):
+    # returned with response_model_exclude_unset: created/updated for a
+    # real run, would_create/would_update and lines for a dry run
+    month: str
+    dry_run: bool
+    employees: int
+    created: Optional[int] = None
+    updated: Optional[int] = None
+    would_create: Optional[int] = None
+    would_update: Optional[int] = None
+    skipped: list[PayrollSkip]
+    totals: PayrollTotals
+    lines: Optional[list[PayrollLine]] = None
+
+
 class DepartmentCreate(BaseModel):
     department_name: str
     description: Optional[str] = None
+
+
+class DepartmentResponse(BaseModel):
+    id: int
+    department_name: str
+    description: Optional[str]
+
+
+class DepartmentCreated(BaseModel):
+    message: str
+    department_id: int
+
+
+class DepartmentHeadcount(BaseModel):
+    department_id: int
+    department_name: str
+    employees: int
+    active_employees: int
+
+
+class AdminDashboardStats(BaseModel):
+    total_employees: int
+    total_departments: int
+    today_attendance: int
+    pending_leaves: int
+
+
+class EmployeeDashboardStats(BaseModel):
+    employee_status: str
+    monthly_attendance: int
+    leave_balance: int
+    current_salary: float
+    total_leaves: int
+
+
+class HashingMetrics(BaseModel):
+    executor: str
+    pool_size: int
+    queue_capacity: int
+    in_flight: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class ResponseCacheMetrics(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    ttl: int
+    hits: int
+    misses: int
+
+
+class MessageResponse(BaseModel):
+    message: str
+
+
+class MeResponse(BaseModel):
+    id: int
+    email: str
+    role: str
+    first_name: str
+    last_name: str
+
+
+class DebugUser(BaseModel):
+    id: int
+    email: str
+    role: str
+    role_repr: str
+
+
+class LoginCheck(BaseModel):
+    email: str
+    original_role: str
+    normalized_role: str
+    redirect_url: str
+
+
+class LoginCheckError(BaseModel):
+    error: str
@@ -0,0 +1,84 @@
+import base64
+import json
+from datetime import date
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(sort: str, values) -> str:
+    payload = json.dumps([sort, [v.isoformat() if isinstance(v, date) else v for v in values]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns) -> list:
+    """Decode an 'after' cursor back into typed values for the sort columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or len(values) != len(columns):
+            raise ValueError("cursor does not match sort")
+        return [
+            date.fromisoformat(value) if column.type.python_type is date and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def check_limit(limit: int) -> int:
+    if limit < 1 or limit > MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit must be between 1 and {MAX_LIMIT}"
+        )
+    return limit
+
+
+def check_sort(sort: str, order: str, allowed) -> None:
+    if sort not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort. Must be one of: {', '.join(allowed)}"
+        )
+    if order not in ("asc", "desc"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid order. Must be 'asc' or 'desc'"
+        )
+
+
+def keyset(statement, sort: str, columns, after: str = None, limit: int = DEFAULT_LIMIT, descending: bool = False):
+    """Apply keyset pagination over `columns` (the sort key, ending in a unique column).
+
+    Fetches one row more than `limit` so the caller can tell whether
+    another page exists (see page()).
+    """
+    if after:
+        values = decode_cursor(after, sort, columns)
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*values) if len(columns) > 1 else values[0]
+        statement = statement.where(key < bound if descending else key > bound)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return statement.order_by(*order).limit(limit + 1)
+
+
+def page(rows, sort: str, limit: int, cursor_values) -> dict:
+    """Trim the extra row fetched by keyset() and build the response envelope.
+
+    `cursor_values(row)` returns the sort key values of a row.
+    """
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": rows,
+        "next_cursor": encode_cursor(sort, cursor_values(rows[-1])) if has_more else None,
+        "limit": limit
+    }
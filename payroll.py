@@ -0,0 +1,167 @@
+"""Batch payroll runs.
+
+A run resolves its scope to (employee_id, salary) rows with one query,
+computes deductions (see deductions.py for the attendance part) and net
+pay for all of them as NumPy arrays and writes the month's Salary rows
+with a single bulk INSERT.
+"""
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from database import batched_upsert
+from deductions import compute_deductions, validate_rules
+from department_catalog import department_catalog
+from model import Employee, PayrollRun, Salary
+from response_cache import note_employee_rows
+
+PAYROLL_SCOPES = ["all", "department", "employees"]
+ON_EXISTING = ["skip", "update"]
+
+
+def validate_run(run: PayrollRun) -> None:
+    if run.scope not in PAYROLL_SCOPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid scope. Must be one of: {', '.join(PAYROLL_SCOPES)}"
+        )
+    if run.scope == "department" and run.department_id is None and not run.department_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="scope 'department' needs department_name or department_id"
+        )
+    if run.scope == "employees" and not run.employee_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="scope 'employees' needs employee_ids"
+        )
+    if run.on_existing not in ON_EXISTING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid on_existing. Must be one of: {', '.join(ON_EXISTING)}"
+        )
+    if run.deduction < 0 or not 0 <= run.deduction_rate <= 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="deduction must be >= 0 and deduction_rate between 0 and 1"
+        )
+    if run.rules is not None:
+        validate_rules(run.rules)
+
+
+async def load_scope(db, run: PayrollRun) -> list:
+    """(employee_id, salary) rows of the active employees in scope"""
+    stmt = select(Employee.employee_id, Employee.salary).where(Employee.is_active == True)
+    if run.scope == "department":
+        department = await department_catalog.find(db, run.department_id, run.department_name)
+        if department is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Department not found"
+            )
+        stmt = stmt.where(Employee.department_id == department.id)
+    elif run.scope == "employees":
+        stmt = stmt.where(Employee.employee_id.in_(run.employee_ids))
+    return (await db.execute(stmt.order_by(Employee.employee_id))).all()
+
+
+def compute_pay(basic: np.ndarray, deduction: float = 0.0, deduction_rate: float = 0.0, extra=0.0):
+    """Deduction and net pay for an array of basic salaries.
+
+    The deduction is a flat amount plus a share of basic pay plus `extra`
+    (per-employee attendance deductions), capped at the basic salary so
+    net pay never goes negative.
+    """
+    deductions = np.minimum(np.round(deduction + basic * deduction_rate + extra, 2), basic)
+    return deductions, np.round(basic - deductions, 2)
+
+
+async def run_payroll(db, run: PayrollRun) -> dict:
+    """Compute (and unless dry_run, write) a month's salaries. The caller commits."""
+    validate_run(run)
+    rows = await load_scope(db, run)
+
+    skipped = []
+    if run.scope == "employees":
+        found = {employee_id for employee_id, _ in rows}
+        skipped += [
+            {"employee_id": employee_id, "reason": "Employee not found or inactive"}
+            for employee_id in dict.fromkeys(run.employee_ids) if employee_id not in found
+        ]
+    skipped += [
+        {"employee_id": employee_id, "reason": "No basic salary on record"}
+        for employee_id, salary in rows if salary is None
+    ]
+    rows = [row for row in rows if row.salary is not None]
+
+    existing = set()
+    if rows:
+        existing = set((await db.scalars(select(Salary.employee_id).where(
+            Salary.month == run.month,
+            Salary.employee_id.in_([employee_id for employee_id, _ in rows])
+        ))).all())
+    if run.on_existing == "skip":
+        skipped += [
+            {"employee_id": employee_id, "reason": "Salary already exists for this month"}
+            for employee_id, _ in rows if employee_id in existing
+        ]
+        rows = [row for row in rows if row.employee_id not in existing]
+
+    employee_ids = [employee_id for employee_id, _ in rows]
+    basic = np.array([salary for _, salary in rows], dtype=np.float64)
+    attendance = np.zeros_like(basic)
+    counts = None
+    if run.apply_attendance and employee_ids:
+        attendance, counts = await compute_deductions(db, employee_ids, basic, run.month, run.rules)
+    deductions, net = compute_pay(basic, run.deduction, run.deduction_rate, attendance)
+
+    created = sum(1 for employee_id in employee_ids if employee_id not in existing)
+    # a dry run writes nothing, so it reports what a real run would do
+    counted = ("would_create", "would_update") if run.dry_run else ("created", "updated")
+    result = {
+        "month": run.month,
+        "dry_run": run.dry_run,
+        "employees": len(employee_ids),
+        counted[0]: created,
+        counted[1]: len(employee_ids) - created,
+        "skipped": skipped,
+        "totals": {
+            "basic_salary": round(float(basic.sum()), 2),
+            "attendance_deduction": round(float(attendance.sum()), 2),
+            "deduction": round(float(deductions.sum()), 2),
+            "net_salary": round(float(net.sum()), 2),
+        },
+    }
+    if run.dry_run:
+        lines = [
+            {"employee_id": employee_id, "basic_salary": b, "deduction": d, "net_salary": n, "attendance_deduction": a}
+            for employee_id, b, d, n, a in zip(
+                employee_ids, basic.tolist(), deductions.tolist(), net.tolist(), attendance.tolist()
+            )
+        ]
+        if counts is not None:
+            for line, absent, late, unpaid in zip(
+                lines, counts["absent"].tolist(), counts["late"].tolist(), counts["unpaid_leave_days"].tolist()
+            ):
+                line.update(absent_days=int(absent), late_marks=int(late), unpaid_leave_days=int(unpaid))
+        result["lines"] = lines
+        return result
+
+    values = [
+        {"employee_id": employee_id, "month": run.month, "basic_salary": b, "deduction": d, "net_salary": n}
+        for employee_id, b, d, n in zip(employee_ids, basic.tolist(), deductions.tolist(), net.tolist())
+    ]
+
+    def overwrite(excluded):
+        return {
+            "basic_salary": excluded.basic_salary,
+            "deduction": excluded.deduction,
+            "net_salary": excluded.net_salary,
+        }
+
+    # on skip, a row written since the existence check above is left alone
+    set_ = overwrite if run.on_existing == "update" else None
+    for stmt in batched_upsert(Salary.__table__, values, [Salary.employee_id, Salary.month], set_):
+        await db.execute(stmt.execution_options(per_employee=True))
+    note_employee_rows(db, "salaries", employee_ids)
+    return result
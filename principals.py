@@ -0,0 +1,126 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+import config
+from model import Employee
+
+
+class Principal(NamedTuple):
+    """The part of an Employee that authorization needs."""
+    id: int
+    employee_id: str
+    role: str
+    is_active: bool
+    token_version: int
+
+
+class TokenClaims(NamedTuple):
+    """Identity taken from the signed JWT alone, without any lookup."""
+    id: int
+    email: str
+    role: str
+    token_version: int
+
+
+def token_version_for(password_hash: str, role: str, is_active: bool) -> int:
+    # Changes whenever the password, role or active flag changes, which
+    # makes every token issued before that change stale.
+    return zlib.crc32(f"{password_hash}:{role}:{is_active}".encode())
+
+
+def principal_from_employee(user: Employee) -> Principal:
+    return Principal(
+        id=user.id,
+        employee_id=user.employee_id,
+        role=user.role,
+        is_active=user.is_active,
+        token_version=token_version_for(user.password_hash, user.role, user.is_active)
+    )
+
+
+class PrincipalCache:
+    """Per-process LRU of principals with a TTL, keyed by (user id, token version)."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, version: int) -> Optional[Principal]:
+        key = (user_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal: Principal):
+        key = (principal.id, principal.token_version)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    max_size=config.PRINCIPAL_CACHE_SIZE,
+    ttl=config.PRINCIPAL_CACHE_TTL
+)
+
+
+# Invalidation: remember which employees had auth-relevant columns changed
+# during a flush and drop them from the cache once the transaction commits.
+_AUTH_FIELDS = ("role", "is_active", "password_hash")
+
+
+def _mark_stale(target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add(target.id)
+
+
+@event.listens_for(Employee, "after_update")
+def _employee_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _AUTH_FIELDS):
+        _mark_stale(target)
+
+
+@event.listens_for(Employee, "after_delete")
+def _employee_deleted(mapper, connection, target):
+    _mark_stale(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop("stale_principals", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("stale_principals", None)
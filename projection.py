@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from model import Employee
+
+# Columns an employee listing may return. password_hash is deliberately
+# missing so it never leaves the database.
+EMPLOYEE_FIELDS = {
+    column.key: column
+    for column in (
+        Employee.id,
+        Employee.employee_id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.email,
+        Employee.phone,
+        Employee.role,
+        Employee.department_id,
+        Employee.is_active,
+        Employee.address,
+        Employee.date_of_birth,
+        Employee.salary,
+        Employee.created_at,
+        Employee.updated_at,
+    )
+}
+
+
+def select_fields(fields: Optional[str], available: dict, always=()) -> list:
+    """Columns for a `fields=a,b,c` sparse fieldset (all available columns if not given).
+
+    Columns in `always` are added when missing, e.g. the keys a cursor is built from.
+    """
+    if not fields:
+        names = list(available)
+    else:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Must be among: {', '.join(available)}"
+            )
+    columns = [available[name] for name in dict.fromkeys(names)]
+    for column in always:
+        if column.key not in names:
+            columns.append(column)
+    return columns
+
+
+def row_dicts(rows, keys=None) -> list:
+    """Rows as dicts, with only `keys` if given (e.g. leaving out a cursor column nobody asked for)"""
+    if keys is None:
+        return [dict(row._mapping) for row in rows]
+    return [{key: row._mapping[key] for key in keys} for row in rows]
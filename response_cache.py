@@ -0,0 +1,254 @@
+"""Response cache for slowly changing admin read endpoints.
+
+A cached endpoint's JSON body is kept per (path, query parameters, role)
+together with the versions of the tables it reads. Any committed write
+bumps the versions of the tables it touched (noted from flushes and from
+INSERT/UPDATE/DELETE statements run through the session), which makes
+every entry built from those tables stale. Bodies live in this process,
+LRU-evicted within RESPONSE_CACHE_BYTES and never served past
+RESPONSE_CACHE_TTL; the version counters live in a pluggable store so
+that several workers can share invalidations. With the per-process
+"memory" store a write made by another worker is only seen once the
+entry expires, so the TTL is what bounds staleness there.
+"""
+import functools
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+import config
+
+
+class MemoryVersionStore:
+    """Table versions of this process only"""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+        # versions restart at 0 with the process, the epoch tells them apart
+        self.epoch = secrets.token_hex(8)
+
+    def get(self, tables) -> tuple:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class SQLiteVersionStore:
+    """Table versions in a local SQLite file, shared by the workers on one machine.
+
+    A stand-in for a networked store (Redis or similar) with the same
+    get/bump interface.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS table_versions ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            # set once per store file and shared by every worker using it
+            conn.execute(
+                "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('__epoch__', ?)",
+                (secrets.randbits(62),)
+            )
+        self.epoch = self.get(("__epoch__",))[0]
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, tables) -> tuple:
+        rows = dict(self._connection().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({','.join('?' * len(tables))})",
+            tuple(tables)
+        ).fetchall())
+        return tuple(rows.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                [(table,) for table in tables]
+            )
+
+
+def make_version_store(backend: str):
+    if backend == "memory":
+        return MemoryVersionStore()
+    if backend == "sqlite":
+        return SQLiteVersionStore(config.RESPONSE_CACHE_STORE)
+    raise ValueError(f"Unknown response cache backend '{backend}'")
+
+
+class ResponseCache:
+    """LRU of response bodies within a byte budget, validated against table versions and age"""
+
+    def __init__(self, max_bytes: int, versions, ttl: int = 0):
+        self.max_bytes = max_bytes
+        self.versions = versions
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires at, table versions, body)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, versions: tuple) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != versions or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, versions: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            expires_at = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+            self._entries[key] = (expires_at, versions, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        body = self._entries.pop(key)[2]
+        self._size -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+response_cache = ResponseCache(
+    max_bytes=config.RESPONSE_CACHE_BYTES,
+    versions=make_version_store(config.RESPONSE_CACHE_BACKEND),
+    ttl=config.RESPONSE_CACHE_TTL
+)
+
+
+def cached_response(*tables: str, response_model, exclude_unset: bool = False):
+    """Cache a JSON endpoint's body until one of `tables` is written.
+
+    The endpoint must take `request` and `current_user` (the role is part
+    of the key, and authorization has run by the time it is called). A
+    miss is validated against the route's response_model and dumped to
+    JSON bytes by pydantic-core directly; the cached body is then
+    returned as is.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def decorate(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if response_cache.max_bytes <= 0:
+                return await endpoint(*args, **kwargs)
+            request = kwargs["request"]
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())), kwargs["current_user"].role)
+            # read before the endpoint runs: a write committed meanwhile
+            # leaves the entry behind the current versions
+            versions = response_cache.versions.get(tables)
+            body = response_cache.get(key, versions)
+            if body is not None:
+                return Response(body, media_type="application/json", headers={"X-Cache": "hit"})
+
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                # a body the endpoint rendered itself (e.g. format=columnar) is kept as is
+                if result.status_code == 200 and result.media_type == "application/json" and hasattr(result, "body"):
+                    response_cache.put(key, versions, result.body)
+                    result.headers["X-Cache"] = "miss"
+                return result
+            body = adapter.dump_json(adapter.validate_python(result, from_attributes=True), exclude_unset=exclude_unset)
+            response_cache.put(key, versions, body)
+            return Response(body, media_type="application/json", headers={"X-Cache": "miss"})
+        return wrapper
+    return decorate
+
+
+# Invalidation: collect the tables a transaction wrote and bump their
+# versions once it commits. Rows that belong to an employee are also
+# noted as "<table>:<employee_id>", and a Core statement whose employees
+# are unknown as "<table>:*"; etags.py persists those, the cache itself
+# only versions whole tables.
+def written_tables(session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+
+def note_employee_rows(db, table: str, employee_ids):
+    """Record whose `table` rows a Core statement run with execution option per_employee=True wrote"""
+    written_tables(db).update(f"{table}:{employee_id}" for employee_id in employee_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    written = written_tables(session)
+    for instance in chain(session.new, session.dirty, session.deleted):
+        names = [table.name for table in inspect(instance).mapper.tables]
+        written.update(names)
+        employee_id = getattr(instance, "employee_id", None)
+        if employee_id is not None:
+            written.update(f"{name}:{employee_id}" for name in names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            written_tables(orm_execute_state.session).add(table.name)
+            if not orm_execute_state.execution_options.get("per_employee"):
+                written_tables(orm_execute_state.session).add(f"{table.name}:*")
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    tables = sorted(name for name in session.info.pop("written_tables", ()) if ":" not in name)
+    if tables:
+        response_cache.versions.bump(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("written_tables", None)
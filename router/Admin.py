@@ -1,12 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Form, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime
-from model import Employee, Department, EmployeeCreate, DepartmentCreate, Salary, Attendance, Leave
-from router.auth import get_current_user, bcrypt_context
-from database import SessionLocal
-from typing import Annotated
+from model import (
+    Employee, Department, EmployeeCreate, DepartmentCreate, Salary, Attendance, Leave, EmployeeResponse, EmployeeListItem, EmployeePage,
+    AttendanceBulkCreate, PayrollRun, LeaveDecision, EmployeeCreated, DepartmentCreated, DepartmentResponse, DepartmentHeadcount,
+    SalaryResponse, SalaryPage, SalaryAdded, SalaryHistoryPage, PayrollResult, AttendanceMarked, AttendanceBulkResult, AttendanceReport,
+    LeavePage, LeaveDecisionResult, AdminDashboardStats, HashingMetrics, ResponseCacheMetrics, MessageResponse
+)
+from router.auth import get_current_claims, get_current_principal
+from principals import Principal, TokenClaims
+from hashing import hash_password, hasher
+from database import dialect_insert, get_db
+from typing import Optional
+from pagination import DEFAULT_LIMIT, MAX_LIMIT, check_limit, check_sort, keyset, page
+from projection import EMPLOYEE_FIELDS, row_dicts, select_fields
+from payroll import run_payroll
+from dashboard_stats import dashboard_stats, record
+from department_catalog import department_catalog
+from response_cache import cached_response, note_employee_rows, response_cache
+from deductions import compute_deductions
+from leave_ledger import add_approved
+from attendance_rollup import apply_marks
+from exports import check_format, export_response
+from attendance_report import ATTENDANCE_STATUSES, REPORT_GROUPS, group_columns, group_rows, marks_query, report_query, summarize
+from columnar import check_response_format, columnar_response, columns_from_rows
+import numpy as np
+import re
+import orjson
+import config
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
+from sqlalchemy import exists, false, func, select, update
 
 
 router = APIRouter(
@@ -16,20 +40,40 @@ router = APIRouter(
 
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 db_dependency = Depends(get_db)
 templates = Jinja2Templates(directory="templates")
 
 
+# Sort keys for the paginated listings, each ending in a unique column
+EMPLOYEE_SORTS = {
+    "id": [Employee.id],
+    "employee_id": [Employee.employee_id],
+}
+SALARY_SORTS = {
+    "id": [Salary.id],
+    "month": [Salary.month, Salary.id],
+}
+LEAVE_SORTS = {
+    "id": [Leave.id],
+    "start_date": [Leave.start_date, Leave.id],
+}
+
+
+
+
+def check_month(value: str) -> str:
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", value):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month format. Use YYYY-MM"
+        )
+    return value
+
+
 # pages
 @router.get("/admin-dashboard")
-def render_admin_dashboard(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_admin_dashboard(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -38,73 +82,73 @@ def render_admin_dashboard(request: Request, current_user: Employee = Depends(ge
     return templates.TemplateResponse("admin-dashboard.html", {"request": request})
 
 @router.get("/employee-list")
-def render_employee_list(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_employee_list(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("employee_list.html", {"request": request})
 
 @router.get("/view_employee")
-def render_view_employee(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_view_employee(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("view.html", {"request": request})
 
 @router.get("/create-employee")
-def render_create_employee(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_create_employee(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("add_new_employee.html", {"request": request})
 
 @router.get("/department-list")
-def render_employee_list(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_employee_list(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("department_list.html", {"request": request})
 
 @router.get("/create-department")
-def render_create_department(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_create_department(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("create_department.html", {"request": request})
 
 @router.get("/leave-list")
-def render_leave_list(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_leave_list(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("leave_list.html", {"request": request})
 
 @router.get("/dep_team")
-def render_dep_team(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_dep_team(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("dep_team.html", {"request": request})
 
 @router.get("/salary-list")
-def render_salary_list(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_salary_list(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("salary_page.html", {"request": request})
 
 @router.get("/employee-salary")
-def render_employee_salary(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_employee_salary(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("employee_salary.html", {"request": request})
 
 @router.get("/add-new-salary")
-def render_add_salary(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_add_salary(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("add_salary.html", {"request": request})
 
 @router.get("/attendance-list")
-def render_attendance_list(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_attendance_list(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("attendance_list.html", {"request": request})
 
 @router.get("/attendance-report")
-def render_attendance_report(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_attendance_report(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("attendance_report.html", {"request": request})
@@ -116,12 +160,12 @@ def render_settings_page_alt(request: Request):
 
 # enpoints
 
-@router.post("/employees")
+@router.post("/employees", response_model=EmployeeCreated)
 async def create_employee(
     request: Request,
     employee_data: EmployeeCreate,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Admin check
     if current_user.role != "admin":
@@ -131,10 +175,10 @@ async def create_employee(
         )
 
     # Duplicate check
-    existing_employee = db.query(Employee).filter(
+    existing_employee = await db.scalar(select(Employee).where(
         (Employee.employee_id == employee_data.employee_id) |
         (Employee.email == employee_data.email)
-    ).first()
+    ).limit(1))
 
     if existing_employee:
         raise HTTPException(
@@ -150,9 +194,7 @@ async def create_employee(
         )
 
     # ✅ Validate department
-    department = db.query(Department).filter(
-        Department.department_name == employee_data.department_name
-    ).first()
+    department = await department_catalog.by_name(db, employee_data.department_name)
 
     if not department:
         raise HTTPException(
@@ -161,7 +203,7 @@ async def create_employee(
         )
 
     # Hash password
-    hashed_password = bcrypt_context.hash(employee_data.password)
+    hashed_password = await hash_password(employee_data.password)
 
     # Convert date_of_birth string to date object
     date_of_birth = None
@@ -195,8 +237,9 @@ async def create_employee(
     )
 
     db.add(new_employee)
-    db.commit()
-    db.refresh(new_employee)
+    record(db, "total_employees", 1)
+    await db.commit()
+    await db.refresh(new_employee)
 
     return {
         "message": "Employee created successfully",
@@ -204,12 +247,12 @@ async def create_employee(
     }
 
 
-@router.post("/departments", response_model=None)
+@router.post("/departments", response_model=DepartmentCreated)
 async def create_department(
     request: Request,
     department_data: DepartmentCreate,
     db = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -219,8 +262,7 @@ async def create_department(
         )
     
     # Check if department name already exists
-    existing_department = db.query(Department).filter(Department.department_name == department_data.department_name).first()
-    if existing_department:
+    if await department_catalog.by_name(db, department_data.department_name):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Department name already exists"
@@ -233,16 +275,18 @@ async def create_department(
     )
     
     db.add(new_department)
-    db.commit()
-    db.refresh(new_department)
+    record(db, "total_departments", 1)
+    await db.commit()
+    await db.refresh(new_department)
     
     return {"message": "Department created successfully", "department_id": new_department.id}
 
-@router.get("/all_departments")
+@router.get("/all_departments", response_model=list[DepartmentResponse])
+@cached_response("departments", response_model=list[DepartmentResponse])
 async def get_all_departments(
     request: Request,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -251,15 +295,31 @@ async def get_all_departments(
             detail="Only admins can view departments"
         )
     
-    departments = db.query(Department).all()
-    return departments
+    return [department._asdict() for department in await department_catalog.all(db)]
+
+
+@router.get("/departments/headcount", response_model=list[DepartmentHeadcount])
+async def get_department_headcount(
+    request: Request,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Total and active employees per department (cached, see department_catalog)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view departments"
+        )
+    
+    return await department_catalog.headcount(db)
 
-@router.get("/department/{department_name}/employees")
+@router.get("/department/{department_name}/employees", response_model=list[EmployeeListItem], response_model_exclude_unset=True)
 async def get_employees_by_department(
     request: Request,
     department_name: str,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    fields: Optional[str] = None,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.role != "admin":
         raise HTTPException(
@@ -267,7 +327,7 @@ async def get_employees_by_department(
             detail="Only admins can view department employees"
         )
     
-    department = db.query(Department).filter(Department.department_name == department_name).first()
+    department = await department_catalog.by_name(db, department_name)
     
     if not department:
         raise HTTPException(
@@ -275,26 +335,39 @@ async def get_employees_by_department(
             detail="Department not found"
         )
     
-    employees = db.query(Employee).filter(Employee.department_id == department.id).all()
-    return employees
+    columns = select_fields(fields, EMPLOYEE_FIELDS)
+    rows = await db.execute(select(*columns).where(Employee.department_id == department.id))
+    return row_dicts(rows)
 
 
 
-@router.get("/test")
+@router.get("/test", response_model=MessageResponse)
 async def test_auth():
     return {"message": "No auth required"}
 
-@router.get("/all_employees_no_auth")
-async def get_all_employees_no_auth(db: Session = db_dependency):
-    employees = db.query(Employee).all()
-    return employees
+@router.get("/all_employees_no_auth", response_model=list[EmployeeListItem], response_model_exclude_unset=True)
+async def get_all_employees_no_auth(fields: Optional[str] = None, db: AsyncSession = db_dependency):
+    rows = await db.execute(select(*select_fields(fields, EMPLOYEE_FIELDS)))
+    return row_dicts(rows)
 
-@router.get("/all_employees")
+@router.get("/all_employees", response_model=EmployeePage, response_model_exclude_unset=True)
+@cached_response("employees", "departments", response_model=EmployeePage, exclude_unset=True)
 async def get_all_employees(
     request: Request,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    fields: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    department: Optional[str] = None,
+    department_id: Optional[int] = None,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    response_format: str = Query("json", alias="format"),
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
+    """Employees a page at a time; format=columnar returns the page as columns (see columnar.py)"""
     # Check if current user is admin
     if current_user.role != "admin":
         raise HTTPException(
@@ -302,15 +375,68 @@ async def get_all_employees(
             detail="Only admins can view employees"
         )
     
-    employees = db.query(Employee).all()
-    return employees   
+    check_limit(limit)
+    check_sort(sort, order, EMPLOYEE_SORTS)
+    check_response_format(response_format)
+    
+    # only the requested columns are fetched, plus the sort key since the
+    # cursor is built from it; that one is dropped again from the page
+    columns = EMPLOYEE_SORTS[sort]
+    requested = [c.key for c in select_fields(fields, EMPLOYEE_FIELDS)]
+    selected = select_fields(fields, EMPLOYEE_FIELDS, always=columns)
+    stmt = select(*selected)
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    if department:
+        department_row = await department_catalog.by_name(db, department)
+        stmt = stmt.where(Employee.department_id == department_row.id if department_row else false())
+    if role:
+        stmt = stmt.where(Employee.role == role)
+    if is_active is not None:
+        stmt = stmt.where(Employee.is_active == is_active)
+    
+    stmt = keyset(stmt, sort, columns, after, limit, descending=order == "desc")
+    result = page((await db.execute(stmt)).all(), sort, limit, lambda e: [getattr(e, c.key) for c in columns])
+    if response_format == "columnar":
+        employees = columns_from_rows(
+            result["items"], [c.key for c in selected], ["role", "department_id"],
+            {"department_id": await department_catalog.names(db)}
+        )
+        employees = {name: employees[name] for name in requested}
+        return columnar_response(employees, len(result["items"]), next_cursor=result["next_cursor"], limit=limit)
+    result["items"] = row_dicts(result["items"], requested)
+    return result
+
+
+@router.get("/employees/{employee_pk}", response_model=EmployeeResponse)
+async def get_employee(
+    request: Request,
+    employee_pk: int,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view employees"
+        )
+    
+    row = (await db.execute(
+        select(*EMPLOYEE_FIELDS.values()).where(Employee.id == employee_pk)
+    )).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Employee not found"
+        )
+    return dict(row._mapping)
 
-@router.get("/employee_fulsalary")
+@router.get("/employee_fulsalary", response_model=list[SalaryResponse])
 async def get_employee_salary(
     request: Request,
     employee_id: str,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -319,19 +445,125 @@ async def get_employee_salary(
             detail="Only admins can view employee salaries"
         )
     
-    salaries = db.query(Salary).filter(Salary.employee_id == employee_id).all()
+    salaries = (await db.scalars(select(Salary).where(Salary.employee_id == employee_id))).all()
     return salaries 
 
 
-@router.post("/add_salary") 
+SALARY_HISTORY_COLUMNS = [Salary.month, Salary.basic_salary, Salary.deduction, Salary.net_salary]
+
+
+def _salary_history_chunks(employees, salaries, next_cursor, limit):
+    """Stream the history page as compact JSON, one employee per chunk"""
+    by_employee = {}
+    for employee_id, *values in salaries:
+        by_employee.setdefault(employee_id, []).append(values)
+    
+    yield b'{"columns":%s,"items":[' % orjson.dumps([c.key for c in SALARY_HISTORY_COLUMNS])
+    for i, (employee_id, first_name, last_name) in enumerate(employees):
+        item = {
+            "employee_id": employee_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "salaries": by_employee.get(employee_id, [])
+        }
+        yield (b"," if i else b"") + orjson.dumps(item)
+    yield b'],"next_cursor":%s,"limit":%d}' % (orjson.dumps(next_cursor), limit)
+
+
+# streamed, so the body is not validated against SalaryHistoryPage; it
+# documents the shape _salary_history_chunks writes
+@router.get(
+    "/salary_history",
+    response_model=None,
+    responses={200: {"model": SalaryHistoryPage, "description": "Streamed one employee at a time"}}
+)
+async def get_salary_history(
+    request: Request,
+    employee_ids: Optional[str] = None,
+    department_id: Optional[int] = None,
+    month_from: Optional[str] = None,
+    month_to: Optional[str] = None,
+    latest: Optional[int] = None,
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Salary history grouped by employee, paginated over employees.
+
+    employee_ids is comma separated; latest=N keeps each employee's N most
+    recent months. Rows come back as arrays in the order of "columns".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view employee salaries"
+        )
+    
+    check_limit(limit)
+    if latest is not None and latest < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latest must be at least 1"
+        )
+    
+    month_filters = []
+    if month_from:
+        month_filters.append(Salary.month >= check_month(month_from))
+    if month_to:
+        month_filters.append(Salary.month <= check_month(month_to))
+    
+    # page of employees that have salaries in range
+    stmt = select(Employee.employee_id, Employee.first_name, Employee.last_name).where(
+        exists().where(Salary.employee_id == Employee.employee_id, *month_filters)
+    )
+    if employee_ids:
+        stmt = stmt.where(Employee.employee_id.in_([e.strip() for e in employee_ids.split(",") if e.strip()]))
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    columns = EMPLOYEE_SORTS["employee_id"]
+    stmt = keyset(stmt, "employee_id", columns, after, limit)
+    employee_page = page((await db.execute(stmt)).all(), "employee_id", limit, lambda e: [e.employee_id])
+    employees = employee_page["items"]
+    
+    # one query for the salaries of the whole page
+    salaries = []
+    if employees:
+        filters = [Salary.employee_id.in_([e.employee_id for e in employees]), *month_filters]
+        if latest:
+            ranked = select(
+                Salary.employee_id,
+                *SALARY_HISTORY_COLUMNS,
+                func.row_number().over(
+                    partition_by=Salary.employee_id,
+                    order_by=Salary.month.desc()
+                ).label("rank")
+            ).where(*filters).subquery()
+            salary_stmt = select(
+                ranked.c.employee_id, *[ranked.c[c.key] for c in SALARY_HISTORY_COLUMNS]
+            ).where(ranked.c.rank <= latest).order_by(ranked.c.employee_id, ranked.c.month.desc())
+        else:
+            salary_stmt = select(Salary.employee_id, *SALARY_HISTORY_COLUMNS).where(
+                *filters
+            ).order_by(Salary.employee_id, Salary.month.desc())
+        salaries = (await db.execute(salary_stmt)).all()
+    
+    return StreamingResponse(
+        _salary_history_chunks(employees, salaries, employee_page["next_cursor"], limit),
+        media_type="application/json"
+    )
+
+
+@router.post("/add_salary", response_model=SalaryAdded)
 async def add_salary(
     request: Request,
     employee_id: str = Form(...),
     month: str = Form(...),
     basic_salary: float = Form(...),
     deduction: float = Form(default=0.0),
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    auto_deduction: bool = Form(default=False),
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -341,7 +573,7 @@ async def add_salary(
         )
     
     # Validate employee exists
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    employee = await db.scalar(select(Employee).where(Employee.employee_id == employee_id).limit(1))
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -349,10 +581,10 @@ async def add_salary(
         )
     
     # Check if salary already exists for this month
-    existing_salary = db.query(Salary).filter(
+    existing_salary = await db.scalar(select(Salary).where(
         (Salary.employee_id == employee_id) &
         (Salary.month == month)
-    ).first()
+    ).limit(1))
     
     if existing_salary:
         raise HTTPException(
@@ -360,6 +592,14 @@ async def add_salary(
             detail="Salary already exists for this employee in this month"
         )
     
+    # Add absence, late and unpaid leave deductions on top of the manual one
+    attendance_deduction = 0.0
+    if auto_deduction:
+        check_month(month)
+        amounts, _ = await compute_deductions(db, [employee_id], np.array([basic_salary]), month)
+        attendance_deduction = float(amounts[0])
+        deduction += attendance_deduction
+    
     # Calculate net salary
     net_salary = basic_salary - deduction
     
@@ -373,23 +613,105 @@ async def add_salary(
     )
     
     db.add(new_salary)
-    db.commit()
-    db.refresh(new_salary)
+    await db.commit()
+    await db.refresh(new_salary)
     
     return {
         "message": "Salary added successfully",
         "salary_id": new_salary.id,
+        "deduction": deduction,
+        "attendance_deduction": attendance_deduction,
         "net_salary": net_salary
     }
 
 
-@router.post("/update_attendance")
+@router.post("/payroll/run", response_model=PayrollResult, response_model_exclude_unset=True)
+async def payroll_run(
+    run: PayrollRun,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Generate a month's salaries for everyone in scope in one transaction"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can run payroll"
+        )
+    
+    check_month(run.month)
+    result = await run_payroll(db, run)
+    if not run.dry_run:
+        await db.commit()
+    return result
+
+
+async def upsert_attendance(db: AsyncSession, marks: dict, day: date) -> dict:
+    """Write {employee_id: status} for `day` and count the changes in the rollups.
+
+    Marks that are new are inserted by one INSERT ... ON CONFLICT DO
+    NOTHING. Only then are the existing rows read, locked (FOR UPDATE; on
+    SQLite the insert already holds the write lock), and updated where
+    the status changed. A concurrent request for the same employee and
+    day therefore waits instead of both counting the mark as new.
+    Returns {employee_id: (attendance_id, created)}. The caller commits.
+    """
+    if not marks:
+        return {}
+    stmt = dialect_insert(Attendance.__table__).values([
+        {"employee_id": employee_id, "work_day": day, "status": mark}
+        for employee_id, mark in marks.items()
+    ]).on_conflict_do_nothing(
+        index_elements=[Attendance.employee_id, Attendance.work_day]
+    ).returning(Attendance.id, Attendance.employee_id)
+    created = {employee_id: attendance_id for attendance_id, employee_id in await db.execute(stmt)}
+    
+    # every mark's row exists now: its id, the employee's department and,
+    # for rows not just created, the status they had
+    current = {
+        employee_id: (attendance_id, department_id, previous)
+        for attendance_id, employee_id, department_id, previous in await db.execute(select(
+            Attendance.id, Attendance.employee_id, Employee.department_id, Attendance.status
+        ).join(
+            Employee, Attendance.employee_id == Employee.employee_id
+        ).where(
+            Attendance.work_day == day,
+            Attendance.employee_id.in_(list(marks))
+        ).with_for_update(of=Attendance))
+    }
+    existing = {
+        employee_id: previous for employee_id, (_, _, previous) in current.items()
+        if employee_id not in created
+    }
+    changed = [
+        {"id": current[employee_id][0], "status": mark}
+        for employee_id, mark in marks.items() if employee_id in existing and existing[employee_id] != mark
+    ]
+    if changed:
+        await db.execute(update(Attendance), changed)
+    
+    # dashboard "present today": marks turning into / out of present
+    present_delta = sum(
+        (mark == "present") - (existing.get(employee_id) == "present")
+        for employee_id, mark in marks.items() if employee_id in current
+    )
+    record(db, "today_attendance", present_delta, day)
+    await apply_marks(db, day, [
+        (current[employee_id][1], existing.get(employee_id), mark)
+        for employee_id, mark in marks.items() if employee_id in current
+    ])
+    return {
+        employee_id: (attendance_id, employee_id in created)
+        for employee_id, (attendance_id, _, _) in current.items()
+    }
+
+
+@router.post("/update_attendance", response_model=AttendanceMarked)
 async def update_attendance(
     request: Request,
     employee_id: str = Form(...),
-    status: str = Form(...),
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    attendance_status: str = Form(..., alias="status"),
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -399,7 +721,7 @@ async def update_attendance(
         )
     
     # Validate employee exists
-    employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
+    employee = await db.scalar(select(Employee.id).where(Employee.employee_id == employee_id).limit(1))
     if not employee:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -407,68 +729,147 @@ async def update_attendance(
         )
     
     # Validate status
-    valid_statuses = ['present', 'absent', 'late']
-    if status not in valid_statuses:
+    if attendance_status not in ATTENDANCE_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+            detail=f"Invalid status. Must be one of: {', '.join(ATTENDANCE_STATUSES)}"
         )
     
-    # Check if attendance already exists for today
-    from datetime import date
-    today = date.today()
-    existing_attendance = db.query(Attendance).filter(
-        (Attendance.employee_id == employee_id) &
-        (func.date(Attendance.date) == today)
-    ).first()
-    
-    if existing_attendance:
-        # Update existing attendance
-        existing_attendance.status = status
-        db.commit()
-        return {
-            "message": "Attendance updated successfully",
-            "attendance_id": existing_attendance.id,
-            "status": status
-        }
-    else:
-        # Create new attendance record
-        new_attendance = Attendance(
-            employee_id=employee_id,
-            status=status
+    # Insert today's record, or update it if it already exists
+    written = await upsert_attendance(db, {employee_id: attendance_status}, date.today())
+    await db.commit()
+    attendance_id, created = written[employee_id]
+    
+    return {
+        "message": "Attendance recorded successfully" if created else "Attendance updated successfully",
+        "attendance_id": attendance_id,
+        "status": attendance_status
+    }
+
+
+@router.post("/attendance/bulk", response_model=AttendanceBulkResult, response_model_exclude_unset=True)
+async def bulk_update_attendance(
+    payload: AttendanceBulkCreate,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Mark today's attendance for many employees in one transaction"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can update attendance"
         )
-        
-        db.add(new_attendance)
-        db.commit()
-        db.refresh(new_attendance)
-        
-        return {
-            "message": "Attendance recorded successfully",
-            "attendance_id": new_attendance.id,
-            "status": status
-        } 
+    
+    by_department = payload.department_name is not None or payload.department_id is not None
+    if by_department != (payload.default_status is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="default_status and a department (department_name or department_id) go together"
+        )
+    
+    # employee_id -> status, explicit records override the department default
+    marks = {}
+    if by_department:
+        department = await department_catalog.find(db, payload.department_id, payload.department_name)
+        if department is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Department not found"
+            )
+        members = await db.scalars(select(Employee.employee_id).where(
+            Employee.department_id == department.id,
+            Employee.is_active == True
+        ))
+        marks = dict.fromkeys(members, payload.default_status)
+    for item in payload.records:
+        marks[item.employee_id] = item.status
+    
+    if not marks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No attendance records given"
+        )
+    if len(marks) > config.ATTENDANCE_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {config.ATTENDANCE_BULK_MAX} employees per request"
+        )
+    
+    # Validate every employee id with one query
+    known = set((await db.scalars(
+        select(Employee.employee_id).where(Employee.employee_id.in_(list(marks)))
+    )).all())
+    failures = {}
+    for employee_id, mark in marks.items():
+        if mark not in ATTENDANCE_STATUSES:
+            failures[employee_id] = f"Invalid status. Must be one of: {', '.join(ATTENDANCE_STATUSES)}"
+        elif employee_id not in known:
+            failures[employee_id] = "Employee not found"
+    
+    today = date.today()
+    valid = {employee_id: mark for employee_id, mark in marks.items() if employee_id not in failures}
+    written = await upsert_attendance(db, valid, today)
+    await db.commit()
+    
+    results = []
+    for employee_id, mark in marks.items():
+        if employee_id in written:
+            attendance_id, created = written[employee_id]
+            results.append({
+                "employee_id": employee_id,
+                "status": mark,
+                "result": "recorded" if created else "updated",
+                "attendance_id": attendance_id
+            })
+        else:
+            results.append({
+                "employee_id": employee_id,
+                "status": mark,
+                "result": "failed",
+                "detail": failures[employee_id]
+            })
+    
+    return {
+        "work_day": today.isoformat(),
+        "recorded": sum(1 for r in results if r["result"] == "recorded"),
+        "updated": sum(1 for r in results if r["result"] == "updated"),
+        "failed": len(failures),
+        "results": results
+    }
         
 
-@router.get("/attendance_report")
+@router.get("/attendance_report", response_model=AttendanceReport, response_model_exclude_unset=True)
 async def get_attendance_report(
     request: Request,
     start_date: str = None,
     end_date: str = None,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    group_by: str = "employee",
+    department_id: Optional[int] = None,
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    response_format: str = Query("json", alias="format"),
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
+    """Attendance in a date range, rolled up per employee, department, day or week.
+
+    Each group carries present/absent/late counts and rates. group_by=none
+    returns the individual marks instead, a page at a time (newest first).
+    format=columnar returns the groups or marks as columns (see columnar.py).
+    """
     # Check if current user is admin
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can view attendance reports"
         )
+    check_response_format(response_format)
     
-    from datetime import datetime, date
+    from datetime import datetime, date, timedelta
     
     # Set default date range (last 30 days if not provided)
     if not start_date:
-        start_date = (date.today() - datetime.timedelta(days=30)).strftime('%Y-%m-%d')
+        start_date = (date.today() - timedelta(days=30)).strftime('%Y-%m-%d')
     if not end_date:
         end_date = date.today().strftime('%Y-%m-%d')
     
@@ -481,39 +882,71 @@ async def get_attendance_report(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Query attendance records with employee details
-    attendance_records = db.query(Attendance, Employee).join(
-        Employee, Attendance.employee_id == Employee.employee_id
-    ).filter(
-        func.date(Attendance.date) >= start_date_obj,
-        func.date(Attendance.date) <= end_date_obj
-    ).order_by(Attendance.date.desc()).all()
-    
-    # Format the response
-    report_data = []
-    for attendance, employee in attendance_records:
-        report_data.append({
-            "id": attendance.id,
-            "employee_id": attendance.employee_id,
-            "employee_name": f"{employee.first_name} {employee.last_name}",
-            "department_id": employee.department_id,
-            "date": attendance.date.strftime('%Y-%m-%d'),
-            "status": attendance.status
-        })
+    if group_by == "none":
+        check_limit(limit)
+        columns = [Attendance.work_day, Attendance.id]
+        stmt = keyset(marks_query(start_date_obj, end_date_obj, department_id), "work_day", columns, after, limit, descending=True)
+        rows = (await db.execute(stmt)).all()
+        result = page(rows, "work_day", limit, lambda r: [r.work_day, r.id])
+        if response_format == "columnar":
+            # employee names and department names become dictionary labels
+            marks = columns_from_rows(
+                result["items"], ["id", "employee_id", "employee_name", "department_id", "date", "status"],
+                ["employee_id", "department_id", "status"],
+                {"employee_id": "employee_name", "department_id": await department_catalog.names(db)}
+            )
+            return columnar_response(
+                marks, len(result["items"]), start_date=start_date, end_date=end_date, group_by=group_by,
+                next_cursor=result["next_cursor"], limit=limit
+            )
+        result["items"] = [
+            {
+                "id": row.id,
+                "employee_id": row.employee_id,
+                "employee_name": row.employee_name,
+                "department_id": row.department_id,
+                "date": row.work_day.isoformat(),
+                "status": row.status
+            }
+            for row in result["items"]
+        ]
+        return {"start_date": start_date, "end_date": end_date, "group_by": group_by, **result}
     
+    if group_by not in REPORT_GROUPS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid group_by. Must be one of: {', '.join(REPORT_GROUPS)}, none"
+        )
+    
+    result = await db.execute(report_query(group_by, start_date_obj, end_date_obj, department_id))
+    if response_format == "columnar":
+        groups, summary, rows = group_columns(group_by, result, await department_catalog.names(db))
+        return columnar_response(
+            groups, rows, start_date=start_date, end_date=end_date, group_by=group_by, summary=summary
+        )
+    groups = group_rows(group_by, result)
     return {
         "start_date": start_date,
         "end_date": end_date,
-        "total_records": len(report_data),
-        "attendance_data": report_data
+        "group_by": group_by,
+        "summary": summarize(groups),
+        "groups": groups
     }
 
 
-@router.get("/all_salaries")
+@router.get("/all_salaries", response_model=SalaryPage)
+@cached_response("salaries", response_model=SalaryPage)
 async def get_all_salaries(
     request: Request,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    employee_id: Optional[str] = None,
+    month_from: Optional[str] = None,
+    month_to: Optional[str] = None,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     # Check if current user is admin
     if current_user.role != "admin":
@@ -522,16 +955,70 @@ async def get_all_salaries(
             detail="Only admins can view salaries"
         )
     
-    salaries = db.query(Salary).all()
-    return salaries
+    check_limit(limit)
+    check_sort(sort, order, SALARY_SORTS)
+    
+    stmt = select(Salary)
+    if employee_id:
+        stmt = stmt.where(Salary.employee_id == employee_id)
+    if month_from:
+        stmt = stmt.where(Salary.month >= check_month(month_from))
+    if month_to:
+        stmt = stmt.where(Salary.month <= check_month(month_to))
+    
+    columns = SALARY_SORTS[sort]
+    stmt = keyset(stmt, sort, columns, after, limit, descending=order == "desc")
+    salaries = (await db.scalars(stmt)).all()
+    return page(salaries, sort, limit, lambda s: [getattr(s, c.key) for c in columns])
+
 
+LEAVE_DECISIONS = {"approve": "approved", "reject": "rejected"}
 
-@router.put("/leaves/{leave_id}/approve")
+
+async def decide_leaves(db: AsyncSession, leave_ids: list, new_status: str) -> list:
+    """Move pending leaves to new_status with one conditional UPDATE.
+
+    Returns the ids that changed; leaves that are no longer pending are
+    left alone, so two admins working the same queue cannot overwrite
+    each other. Approved days go into the leave ledger in the same
+    transaction. The caller commits.
+    """
+    result = await db.execute(
+        update(Leave)
+        .where(Leave.id.in_(leave_ids), Leave.status == "pending")
+        .values(status=new_status)
+        .returning(Leave.id, Leave.employee_id, Leave.start_date, Leave.end_date)
+        .execution_options(synchronize_session=False, per_employee=True)
+    )
+    rows = result.all()
+    note_employee_rows(db, "leaves", {employee_id for _, employee_id, _, _ in rows})
+    if new_status == "approved":
+        await add_approved(db, [(employee_id, start, end) for _, employee_id, start, end in rows])
+    record(db, "pending_leaves", -len(rows))
+    return sorted(leave_id for leave_id, *_ in rows)
+
+
+async def _decide_one(db: AsyncSession, leave_id: int, new_status: str):
+    if not await decide_leaves(db, [leave_id], new_status):
+        current = await db.scalar(select(Leave.status).where(Leave.id == leave_id))
+        if current is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Leave not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Leave is already {current}"
+        )
+    await db.commit()
+
+
+@router.put("/leaves/{leave_id}/approve", response_model=MessageResponse)
 async def approve_leave(
     request: Request,
     leave_id: int,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.role != "admin":
         raise HTTPException(
@@ -539,25 +1026,16 @@ async def approve_leave(
             detail="Only admins can approve leaves"
         )
     
-    leave = db.query(Leave).filter(Leave.id == leave_id).first()
-    if not leave:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Leave not found"
-        )
-    
-    leave.status = "approved"
-    db.commit()
-    
+    await _decide_one(db, leave_id, "approved")
     return {"message": "Leave approved successfully"}
 
 
-@router.put("/leaves/{leave_id}/reject")
+@router.put("/leaves/{leave_id}/reject", response_model=MessageResponse)
 async def reject_leave(
     request: Request,
     leave_id: int,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.role != "admin":
         raise HTTPException(
@@ -565,39 +1043,161 @@ async def reject_leave(
             detail="Only admins can reject leaves"
         )
     
-    leave = db.query(Leave).filter(Leave.id == leave_id).first()
-    if not leave:
+    await _decide_one(db, leave_id, "rejected")
+    return {"message": "Leave rejected successfully"}
+
+
+@router.post("/leaves/decision", response_model=LeaveDecisionResult, response_model_exclude_unset=True)
+async def decide_leaves_bulk(
+    payload: LeaveDecision,
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Approve or reject many pending leaves in one statement"""
+    if current_user.role != "admin":
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Leave not found"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can approve or reject leaves"
         )
     
-    leave.status = "rejected"
-    db.commit()
+    if payload.decision not in LEAVE_DECISIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid decision. Must be one of: {', '.join(LEAVE_DECISIONS)}"
+        )
+    leave_ids = list(dict.fromkeys(payload.leave_ids))
+    if not leave_ids or len(leave_ids) > MAX_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Give between 1 and {MAX_LIMIT} leave ids"
+        )
     
-    return {"message": "Leave rejected successfully"}
+    new_status = LEAVE_DECISIONS[payload.decision]
+    changed = await decide_leaves(db, leave_ids, new_status)
+    await db.commit()
+    
+    # report why the rest did not change
+    done = set(changed)
+    unchanged = [leave_id for leave_id in leave_ids if leave_id not in done]
+    current = {}
+    if unchanged:
+        current = dict((await db.execute(
+            select(Leave.id, Leave.status).where(Leave.id.in_(unchanged))
+        )).all())
+    
+    return {
+        "status": new_status,
+        "changed": changed,
+        "unchanged": [
+            {"id": leave_id, "status": current[leave_id]} if leave_id in current
+            else {"id": leave_id, "status": None, "detail": "Leave not found"}
+            for leave_id in unchanged
+        ]
+    }
 
 
-@router.get("/leaves")
+LEAVE_LIST_COLUMNS = [
+    Leave.id,
+    Leave.employee_id,
+    Leave.leave_type,
+    Leave.start_date,
+    Leave.end_date,
+    Leave.status,
+    Leave.reason,
+    Employee.first_name,
+    Employee.last_name,
+    Employee.department_id,
+    Department.department_name,
+]
+
+
+def leave_listing(employee_id=None, department_id=None, department=None, from_date=None, to_date=None, status_filter=None):
+    """The leave listing statement (unordered) and its filters other than status, which the counts share"""
+    filters = []
+    if employee_id:
+        filters.append(Leave.employee_id == employee_id)
+    if department_id is not None:
+        filters.append(Employee.department_id == department_id)
+    if department:
+        filters.append(Department.department_name == department)
+    if from_date:
+        filters.append(Leave.end_date >= from_date)
+    if to_date:
+        filters.append(Leave.start_date <= to_date)
+    
+    stmt = select(*LEAVE_LIST_COLUMNS).join(
+        Employee, Employee.employee_id == Leave.employee_id
+    ).outerjoin(
+        Department, Department.id == Employee.department_id
+    ).where(*filters)
+    if status_filter:
+        stmt = stmt.where(Leave.status == status_filter)
+    return stmt, filters
+
+
+@router.get("/leaves", response_model=LeavePage, response_model_exclude_unset=True)
+@cached_response("leaves", "employees", "departments", response_model=LeavePage, exclude_unset=True)
 async def get_all_leaves(
     request: Request,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    limit: int = DEFAULT_LIMIT,
+    after: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    status_filter: Optional[str] = Query(None, alias="status"),
+    employee_id: Optional[str] = None,
+    department_id: Optional[int] = None,
+    department: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    include_counts: bool = False,
+    response_format: str = Query("json", alias="format"),
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
+    """Leave applications with employee name and department joined in.
+
+    from_date/to_date select leaves overlapping that range.
+    include_counts adds the number of leaves per status for the same
+    filters (ignoring status), for queue summaries. format=columnar
+    returns the page as columns (see columnar.py).
+    """
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can view all leaves"
         )
     
-    leaves = db.query(Leave).all()
-    return leaves
+    check_limit(limit)
+    check_sort(sort, order, LEAVE_SORTS)
+    check_response_format(response_format)
+    
+    stmt, filters = leave_listing(employee_id, department_id, department, from_date, to_date, status_filter)
+    columns = LEAVE_SORTS[sort]
+    stmt = keyset(stmt, sort, columns, after, limit, descending=order == "desc")
+    result = page((await db.execute(stmt)).all(), sort, limit, lambda l: [getattr(l, c.key) for c in columns])
+    
+    if include_counts:
+        counts_stmt = select(Leave.status, func.count()).where(*filters).group_by(Leave.status)
+        if department_id is not None or department:
+            counts_stmt = counts_stmt.join(Employee, Employee.employee_id == Leave.employee_id)
+        if department:
+            counts_stmt = counts_stmt.join(Department, Department.id == Employee.department_id)
+        result["counts"] = {leave_status: count for leave_status, count in await db.execute(counts_stmt)}
+    
+    if response_format == "columnar":
+        leaves = columns_from_rows(
+            result.pop("items"), [c.key for c in LEAVE_LIST_COLUMNS],
+            ["leave_type", "status", "department_id"], {"department_id": "department_name"}
+        )
+        return columnar_response(leaves, len(leaves["id"]), **result)
+    result["items"] = row_dicts(result["items"])
+    return result
 
-@router.get("/dashboard-stats")
+@router.get("/dashboard-stats", response_model=AdminDashboardStats)
 async def get_dashboard_stats(
     request: Request,
-    db: Session = db_dependency,
-    current_user: Employee = Depends(get_current_user)
+    db: AsyncSession = db_dependency,
+    current_user: Principal = Depends(get_current_principal)
 ):
     if current_user.role != "admin":
         raise HTTPException(
@@ -605,27 +1205,123 @@ async def get_dashboard_stats(
             detail="Only admins can view dashboard stats"
         )
     
-    from datetime import date
-    today = date.today()
+    # counters are kept in memory and maintained by the write paths
+    return await dashboard_stats.get(db)
+
+
+@router.get("/hashing-metrics", response_model=HashingMetrics)
+async def get_hashing_metrics(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal)
+):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view hashing metrics"
+        )
+
+    return hasher.metrics()
+
+
+@router.get("/response-cache-metrics", response_model=ResponseCacheMetrics)
+async def get_response_cache_metrics(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal)
+):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view cache metrics"
+        )
+
+    return response_cache.metrics()
+
+
+# exports
+def _require_export_admin(current_user: Principal):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export data"
+        )
+
+
+@router.get("/export/attendance")
+async def export_attendance(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department_id: Optional[int] = None,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Attendance marks in a date range (default: this year so far), streamed as CSV or NDJSON"""
+    _require_export_admin(current_user)
+    check_format(export_format)
     
-    # Total employees
-    total_employees = db.query(Employee).count()
+    end_date = end_date or date.today()
+    start_date = start_date or end_date.replace(month=1, day=1)
+    stmt = select(
+        Attendance.id, Attendance.employee_id, Employee.first_name, Employee.last_name,
+        Employee.department_id, Attendance.work_day, Attendance.status
+    ).join(
+        Employee, Employee.employee_id == Attendance.employee_id
+    ).where(
+        Attendance.work_day >= start_date,
+        Attendance.work_day <= end_date
+    ).order_by(Attendance.work_day, Attendance.id)
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    
+    columns = ["id", "employee_id", "first_name", "last_name", "department_id", "date", "status"]
+    return export_response(stmt, columns, export_format, f"attendance_{start_date}_to_{end_date}", gzip)
+
+
+@router.get("/export/salaries")
+async def export_salaries(
+    month_from: Optional[str] = None,
+    month_to: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Salary records, optionally limited to a month range or one employee"""
+    _require_export_admin(current_user)
+    check_format(export_format)
     
-    # Total departments
-    total_departments = db.query(Department).count()
+    stmt = select(
+        Salary.id, Salary.employee_id, Salary.month, Salary.basic_salary, Salary.deduction, Salary.net_salary
+    ).order_by(Salary.month, Salary.id)
+    if month_from:
+        stmt = stmt.where(Salary.month >= check_month(month_from))
+    if month_to:
+        stmt = stmt.where(Salary.month <= check_month(month_to))
+    if employee_id:
+        stmt = stmt.where(Salary.employee_id == employee_id)
     
-    # Today's attendance
-    today_attendance = db.query(Attendance).filter(
-        func.date(Attendance.date) == today,
-        Attendance.status == 'present'
-    ).count()
+    columns = ["id", "employee_id", "month", "basic_salary", "deduction", "net_salary"]
+    return export_response(stmt, columns, export_format, f"salaries_{month_from or 'start'}_to_{month_to or 'latest'}", gzip)
+
+
+@router.get("/export/employees")
+async def export_employees(
+    department_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    fields: Optional[str] = None,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Employee records (never the password hash); fields= picks the columns"""
+    _require_export_admin(current_user)
+    check_format(export_format)
     
-    # Pending leaves
-    pending_leaves = db.query(Leave).filter(Leave.status == 'pending').count()
+    columns = select_fields(fields, EMPLOYEE_FIELDS)
+    stmt = select(*columns).order_by(Employee.id)
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    if is_active is not None:
+        stmt = stmt.where(Employee.is_active == is_active)
     
-    return {
-        "total_employees": total_employees,
-        "total_departments": total_departments,
-        "today_attendance": today_attendance,
-        "pending_leaves": pending_leaves
-    }
+    return export_response(stmt, [c.key for c in columns], export_format, "employees", gzip)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
-from model import Employee
-from database import SessionLocal
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from model import Employee, DebugUser, LoginCheck, LoginCheckError, MeResponse
+from database import get_db
+from hashing import verify_password
+from principals import (
+    Principal, TokenClaims, principal_cache, principal_from_employee, token_version_for
+)
 from fastapi.security import OAuth2PasswordBearer,OAuth2PasswordRequestForm
-from typing import Annotated
+from typing import Annotated, Union
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi.templating import Jinja2Templates
@@ -20,19 +24,9 @@ SECRET_KEY = '5c0a8d6370428e3d20b4810f181e2ec5c6bfe2837249e0781eb6f1077a96df3d'
 ALGORITHM = 'HS256'
 
 oauth2_bearer =  OAuth2PasswordBearer(tokenUrl="auth/token")
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        
-        
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 templates = Jinja2Templates(directory="templates")
 
@@ -45,15 +39,15 @@ def render_login_page(request: Request):
 def redirect_to_login():
     return RedirectResponse(url="/auth/login-page")
 
-def authenticate_user(email: str, password: str,db):
+async def authenticate_user(email: str, password: str,db):
     print(f"Trying to authenticate: {email}")
-    user = db.query(Employee).filter(Employee.email == email).first()
+    user = await db.scalar(select(Employee).where(Employee.email == email).limit(1))
     if not user:
         print("User not found")
         return False
     print(f"User found: {user.email}, role: {user.role}")
     print(f"Stored hash: {user.password_hash[:20]}...")
-    if not bcrypt_context.verify(password, user.password_hash):
+    if not await verify_password(password, user.password_hash):
         print("Password verification failed")
         return False
     print("Authentication successful")
@@ -61,20 +55,37 @@ def authenticate_user(email: str, password: str,db):
 
 
 
-def create_access_token(email: str, user_id: int, role: str, expires_delta: timedelta):
+def create_access_token(email: str, user_id: int, role: str, token_version: int, expires_delta: timedelta):
     payload = {
         "sub": email,
         "id": user_id,
         "role": role,
+        "ver": token_version,
         "exp": datetime.utcnow() + expires_delta
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
-    request: Request,
-    db: db_dependency
-):
+def set_access_token_cookie(response: Response, user: Employee):
+    access_token = create_access_token(
+        user.email,
+        user.id,
+        user.role,
+        token_version_for(user.password_hash, user.role, user.is_active),
+        timedelta(minutes=60)
+    )
+
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        secure=False,
+        samesite="lax",
+        max_age=3600
+    )
+
+
+def decode_token(request: Request) -> TokenClaims:
     token = request.cookies.get("access_token")
 
     if not token:
@@ -94,11 +105,63 @@ async def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(Employee).filter(Employee.id == user_id).first()
+    return TokenClaims(
+        id=user_id,
+        email=email,
+        role=payload.get("role") or "",
+        token_version=payload.get("ver", 0)
+    )
+
+
+def get_current_claims(request: Request) -> TokenClaims:
+    """Authorize from the signed token only (role-only page routes)"""
+    return decode_token(request)
+
+
+async def get_current_principal(
+    request: Request,
+    db: db_dependency
+) -> Principal:
+    """Resolve the caller from the principal cache, hitting the database only on a miss"""
+    claims = decode_token(request)
+
+    principal = principal_cache.get(claims.id, claims.token_version)
+    if principal is None:
+        user = await db.get(Employee, claims.id)
+
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        principal = principal_from_employee(user)
+        if principal.token_version != claims.token_version:
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+
+        principal_cache.put(principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=401, detail="Account is inactive")
+
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    db: db_dependency
+):
+    claims = decode_token(request)
+
+    user = await db.get(Employee, claims.id)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    principal = principal_from_employee(user)
+    if principal.token_version != claims.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    if not user.is_active:
+        raise HTTPException(status_code=401, detail="Account is inactive")
+
     return user
 
 
@@ -106,7 +169,7 @@ async def get_current_user(
 async def login(
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Write to a log file to ensure we can see if this is called
     with open("login_debug.txt", "a") as f:
@@ -114,19 +177,13 @@ async def login(
     
     print("=== LOGIN ENDPOINT HIT ===")
     print(f"Login attempt - Email: {email}, Password: {password}")
-    user = authenticate_user(email, password, db)
+    user = await authenticate_user(email, password, db)
 
     if not user:
         print("Authentication failed")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     print(f"Login successful for user: {user.email}, role: {user.role}")
-    access_token = create_access_token(
-        user.email,
-        user.id,
-        user.role,
-        timedelta(minutes=60)
-    )
 
     # Redirect based on user role
     role = user.role.strip().lower()
@@ -147,23 +204,16 @@ async def login(
         status_code=status.HTTP_302_FOUND
     )
 
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        max_age=3600
-    )
+    set_access_token_cookie(response, user)
 
     return response
 
 
 
 @router.get("/test-redirect/{email}")
-async def test_redirect_get(email: str, db: Session = Depends(get_db)):
+async def test_redirect_get(email: str, db: AsyncSession = Depends(get_db)):
     """Simple GET test to check redirect logic"""
-    user = db.query(Employee).filter(Employee.email == email).first()
+    user = await db.scalar(select(Employee).where(Employee.email == email).limit(1))
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -180,13 +230,13 @@ async def test_redirect_get(email: str, db: Session = Depends(get_db)):
     return RedirectResponse(url=redirect_url, status_code=302)
 
 
-@router.post("/test-login")
+@router.post("/test-login", response_model=Union[LoginCheck, LoginCheckError])
 async def test_login(
     email: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Test endpoint to check role-based redirect logic"""
-    user = db.query(Employee).filter(Employee.email == email).first()
+    user = await db.scalar(select(Employee).where(Employee.email == email).limit(1))
     
     if not user:
         return {"error": "User not found"}
@@ -208,9 +258,9 @@ async def test_login(
     }
 
 
-@router.get("/debug-users")
-async def debug_users(db: Session = Depends(get_db)):
-    users = db.query(Employee).all()
+@router.get("/debug-users", response_model=list[DebugUser])
+async def debug_users(db: AsyncSession = Depends(get_db)):
+    users = (await db.scalars(select(Employee))).all()
     return [
         {
             "id": user.id,
@@ -222,7 +272,7 @@ async def debug_users(db: Session = Depends(get_db)):
     ]
 
 
-@router.get("/me")
+@router.get("/me", response_model=MeResponse)
 async def get_me(
     request: Request,
     current_user: Employee = Depends(get_current_user)
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from datetime import datetime, date
-from model import Employee, Leave, Salary, Attendance
-from database import SessionLocal
-from router.auth import get_current_user, bcrypt_context
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, timedelta
+from model import Employee, Leave, LeaveLedger, Salary, Attendance, ProfileResponse, LeaveApplied, MyLeaves, MySalaries, EmployeeDashboardStats
+from database import get_db
+from router.auth import get_current_claims, get_current_principal
+from principals import Principal, TokenClaims
 from pydantic import BaseModel
 from typing import Optional
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
+from dashboard_stats import record
+from etags import employee_etag, not_modified, tagged
+import config
 
 
 router = APIRouter(
@@ -16,14 +21,6 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-    
-
 
 # Pydantic models for individual settings management
 class ChangePasswordRequest(BaseModel):
@@ -44,7 +41,7 @@ templates = Jinja2Templates(directory="templates")
 
 # pages
 @router.get("/employee-dashboard")
-def render_employee_dashboard(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_employee_dashboard(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -53,31 +50,31 @@ def render_employee_dashboard(request: Request, current_user: Employee = Depends
     return templates.TemplateResponse("employee_dashboard.html", {"request": request})
 
 @router.get("/view-profile")
-def render_view_profile(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_view_profile(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("view_profile.html", {"request": request})
 
 @router.get("/my-leaves-page")
-def render_my_leaves_page(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_my_leaves_page(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("leave-page.html", {"request": request})
 
 @router.get("/leave-page")
-def render_apply_leave_page(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_apply_leave_page(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("leave_page.html", {"request": request})
 
 @router.get("/apply-leave-page")
-def render_apply_leave_page(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_apply_leave_page(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("apply_leave.html", {"request": request})
 
 @router.get("/my-salary-page")
-def render_my_salary_page(request: Request, current_user: Employee = Depends(get_current_user)):
+def render_my_salary_page(request: Request, current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != "employee":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     return templates.TemplateResponse("my_salary.html", {"request": request})
@@ -85,57 +82,34 @@ def render_my_salary_page(request: Request, current_user: Employee = Depends(get
 
 
 # endpoints
-@router.get("/profile")
+@router.get("/profile", response_model=ProfileResponse)
 async def get_profile(
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's profile information"""
-    
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
+    """Get current user's profile information (conditional on If-None-Match)"""
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    etag = await employee_etag(db, current_user.employee_id, "employees")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     
-    return {
-        "id": user.id,
-        "employee_id": user.employee_id,
-        "first_name": user.first_name,
-        "last_name": user.last_name,
-        "email": user.email,
-        "phone": user.phone,
-        "address": user.address,
-        "role": user.role,
-        "is_active": user.is_active,
-        "salary": user.salary,
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "updated_at": user.updated_at.isoformat() if user.updated_at else None
-    }
+    user = await db.get(Employee, current_user.id)
+    return tagged(ProfileResponse.model_validate(user), etag)
 
 
-@router.post("/apply-leave")
+@router.post("/apply-leave", response_model=LeaveApplied)
 async def apply_leave(
     leave_type: str = Form(...),
     start_date: date = Form(...),
     end_date: date = Form(...),
     reason: Optional[str] = Form(None),
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Apply for leave using form data with date picker"""
     
-    # Get user from database
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Validate leave_type
     valid_leave_types = ['annual', 'sick', 'personal', 'maternity', 'unpaid']
     if leave_type.lower() not in valid_leave_types:
@@ -159,11 +133,11 @@ async def apply_leave(
         )
     
     # Check for overlapping leave applications
-    overlapping_leave = db.query(Leave).filter(
-        (Leave.employee_id == user.employee_id) &
+    overlapping_leave = await db.scalar(select(Leave).where(
+        (Leave.employee_id == current_user.employee_id) &
         (Leave.status.in_(['pending', 'approved'])) &
         ((Leave.start_date <= end_date) & (Leave.end_date >= start_date))
-    ).first()
+    ).limit(1))
     
     if overlapping_leave:
         raise HTTPException(
@@ -173,7 +147,7 @@ async def apply_leave(
     
     # Create leave application
     new_leave = Leave(
-        employee_id=user.employee_id,  # Use string employee_id instead of integer id
+        employee_id=current_user.employee_id,  # Use string employee_id instead of integer id
         leave_type=leave_type.lower(),
         start_date=start_date,
         end_date=end_date,
@@ -182,8 +156,9 @@ async def apply_leave(
     )
     
     db.add(new_leave)
-    db.commit()
-    db.refresh(new_leave)
+    record(db, "pending_leaves", 1)
+    await db.commit()
+    await db.refresh(new_leave)
     
     # Calculate number of days
     num_days = (end_date - start_date).days + 1
@@ -193,136 +168,101 @@ async def apply_leave(
         "leave_id": new_leave.id,
         "status": "pending",
         "leave_type": new_leave.leave_type,
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
+        "start_date": start_date,
+        "end_date": end_date,
         "number_of_days": num_days
     }
 
 
-@router.get("/my-leaves")
+@router.get("/my-leaves", response_model=MyLeaves)
 async def get_my_leaves(
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all leave applications for current user"""
-    
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
+    """Get all leave applications for current user (conditional on If-None-Match)"""
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    etag = await employee_etag(db, current_user.employee_id, "leaves")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     
-    leaves = db.query(Leave).filter(Leave.employee_id == user.employee_id).all()
+    leaves = (await db.scalars(select(Leave).where(Leave.employee_id == current_user.employee_id))).all()
     
-    return {
-        "employee_id": user.employee_id,
+    return tagged(MyLeaves.model_validate({
+        "employee_id": current_user.employee_id,
         "total_applications": len(leaves),
-        "leaves": [
-            {
-                "id": leave.id,
-                "leave_type": leave.leave_type,
-                "start_date": leave.start_date.isoformat(),
-                "end_date": leave.end_date.isoformat(),
-                "status": leave.status,
-                "reason": leave.reason,
-                "days": (leave.end_date - leave.start_date).days + 1
-            }
-            for leave in leaves
-        ]
-    }
+        "leaves": leaves
+    }, from_attributes=True), etag)
 
 
-@router.get("/dashboard-stats")
+def dashboard_query(employee_id: str, today: date):
+    """One row with the employee dashboard figures, as scalar subqueries"""
+    # Current month for attendance calculation
+    month_start = today.replace(day=1)
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    
+    this_year = (LeaveLedger.employee_id == employee_id, LeaveLedger.year == today.year)
+    return select(
+        select(func.count()).select_from(Attendance).where(
+            Attendance.employee_id == employee_id,
+            Attendance.work_day >= month_start,
+            Attendance.work_day < next_month_start,
+            Attendance.status == 'present'
+        ).scalar_subquery().label("monthly_attendance"),
+        select(func.count()).select_from(Leave).where(
+            Leave.employee_id == employee_id
+        ).scalar_subquery().label("total_leaves"),
+        # no ledger row yet means no approved leave this year
+        func.coalesce(select(LeaveLedger.entitled_days).where(*this_year).scalar_subquery(), config.LEAVE_ANNUAL_DAYS).label("entitled_days"),
+        func.coalesce(select(LeaveLedger.used_days).where(*this_year).scalar_subquery(), 0).label("used_days"),
+        select(Salary.net_salary).where(
+            Salary.employee_id == employee_id
+        ).order_by(Salary.month.desc()).limit(1).scalar_subquery().label("latest_salary"),
+        select(Employee.salary).where(
+            Employee.employee_id == employee_id
+        ).scalar_subquery().label("basic_salary"),
+    )
+
+
+@router.get("/dashboard-stats", response_model=EmployeeDashboardStats)
 async def get_employee_dashboard_stats(
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get dashboard statistics for current employee"""
-    
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    from datetime import datetime, timedelta
-    from sqlalchemy import func, extract
-    
-    # Current month for attendance calculation
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    # Get attendance count for current month
-    monthly_attendance = db.query(Attendance).filter(
-        Attendance.employee_id == user.employee_id,
-        extract('month', Attendance.date) == current_month,
-        extract('year', Attendance.date) == current_year,
-        Attendance.status == 'present'
-    ).count()
+    """Get dashboard statistics for current employee (one aggregate query)"""
     
-    # Get total leave applications
-    total_leaves = db.query(Leave).filter(Leave.employee_id == user.employee_id).count()
-    
-    # Calculate leave balance (assuming 30 days annual leave)
-    approved_leaves = db.query(Leave).filter(
-        Leave.employee_id == user.employee_id,
-        Leave.status == 'approved',
-        extract('year', Leave.start_date) == current_year
-    ).all()
-    
-    used_leave_days = sum([(leave.end_date - leave.start_date).days + 1 for leave in approved_leaves])
-    leave_balance = max(0, 30 - used_leave_days)  # 30 days annual leave
-    
-    # Get latest salary
-    latest_salary = db.query(Salary).filter(
-        Salary.employee_id == user.employee_id
-    ).order_by(Salary.month.desc()).first()
-    
-    current_salary = latest_salary.net_salary if latest_salary else user.salary or 0
+    row = (await db.execute(dashboard_query(current_user.employee_id, date.today()))).one()
     
     return {
-        "employee_status": "Active" if user.is_active else "Inactive",
-        "monthly_attendance": monthly_attendance,
-        "leave_balance": leave_balance,
-        "current_salary": current_salary,
-        "total_leaves": total_leaves
+        "employee_status": "Active" if current_user.is_active else "Inactive",
+        "monthly_attendance": row.monthly_attendance,
+        "leave_balance": max(0, row.entitled_days - row.used_days),
+        "current_salary": row.latest_salary if row.latest_salary is not None else row.basic_salary or 0,
+        "total_leaves": row.total_leaves
     }
 
 
-@router.get("/my-salaries")
+@router.get("/my-salaries", response_model=MySalaries)
 async def get_my_salaries(
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all salary records for current user"""
+    """Get all salary records for current user (conditional on If-None-Match)"""
     
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    etag = await employee_etag(db, current_user.employee_id, "salaries")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     
-    salaries = db.query(Salary).filter(Salary.employee_id == user.employee_id).all()
+    salaries = (await db.scalars(select(Salary).where(Salary.employee_id == current_user.employee_id))).all()
     
-    return {
-        "employee_id": user.employee_id,
+    return tagged(MySalaries.model_validate({
+        "employee_id": current_user.employee_id,
         "total_salaries": len(salaries),
-        "salaries": [
-            {
-                "id": salary.id,
-                "employee_id": salary.employee_id,
-                "month": salary.month,
-                "basic_salary": salary.basic_salary,
-                "deduction": salary.deduction,
-                "net_salary": salary.net_salary
-            }
-            for salary in salaries
-        ]
-    }
+        "salaries": salaries
+    }, from_attributes=True), etag)
     
     
     
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from datetime import datetime, date
-from model import Employee, Leave
-from database import SessionLocal
-from router.auth import get_current_user, bcrypt_context
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from model import Employee, ProfileResponse
+from database import get_db
+from router.auth import get_current_principal, get_current_user, set_access_token_cookie
+from principals import Principal
+from etags import employee_etag, not_modified, tagged
+from hashing import hash_password, verify_password
 from pydantic import BaseModel
-from typing import Optional
-from fastapi import Request
+from fastapi import Request, Response
 from fastapi.templating import Jinja2Templates
 
 router = APIRouter(
@@ -14,12 +16,6 @@ router = APIRouter(
     tags=['settings']
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 
 # Pydantic models for individual settings management
@@ -34,6 +30,21 @@ class UpdatePhoneRequest(BaseModel):
 
 class UpdateAddressRequest(BaseModel):
     address: str
+
+
+class PasswordChanged(BaseModel):
+    message: str
+    email: str
+
+
+class PhoneUpdated(BaseModel):
+    message: str
+    phone: str
+
+
+class AddressUpdated(BaseModel):
+    message: str
+    address: str
     
 db_dependency = Depends(get_db) 
 templates = Jinja2Templates(directory="templates")   
@@ -51,42 +62,29 @@ def render_settings_page_alt(request: Request):
 
 # endpoints
 
-@router.get("/profile")
+@router.get("/profile", response_model=ProfileResponse)
 async def get_profile(
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = db_dependency
 ):
-    """Get current user's profile information"""
+    """Get current user's profile information (conditional on If-None-Match)"""
     
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
+    etag = await employee_etag(db, current_user.employee_id, "employees")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    return {
-        "id": user.id,
-        "employee_id": user.employee_id,
-        "first_name": user.first_name,
-        "last_name": user.last_name,
-        "email": user.email,
-        "phone": user.phone,
-        "address": user.address,
-        "role": user.role,
-        "is_active": user.is_active,
-        "salary": user.salary,
-        "created_at": user.created_at.isoformat() if user.created_at else None,
-        "updated_at": user.updated_at.isoformat() if user.updated_at else None
-    }
+    user = await db.get(Employee, current_user.id)
+    return tagged(ProfileResponse.model_validate(user), etag)
 
 
-@router.post("/change-password")
+@router.post("/change-password", response_model=PasswordChanged)
 async def change_password(
     password_data: ChangePasswordRequest,
+    response: Response,
     current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change current user's password"""
     
@@ -97,17 +95,8 @@ async def change_password(
             detail="New passwords do not match"
         )
     
-    # Get user from database
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Verify old password
-    if not bcrypt_context.verify(password_data.old_password, user.password_hash):
+    if not await verify_password(password_data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Old password is incorrect"
@@ -121,22 +110,25 @@ async def change_password(
         )
     
     # Hash and update password
-    user.password_hash = bcrypt_context.hash(password_data.new_password)
-    user.updated_at = datetime.utcnow()
+    current_user.password_hash = await hash_password(password_data.new_password)
+    current_user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    
+    # The password change revokes existing tokens, so issue a fresh one
+    set_access_token_cookie(response, current_user)
     
     return {
         "message": "Password changed successfully",
-        "email": user.email
+        "email": current_user.email
     }
 
 
-@router.post("/update-phone")
+@router.post("/update-phone", response_model=PhoneUpdated)
 async def update_phone(
     phone_data: UpdatePhoneRequest,
     current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user's phone number"""
     
@@ -147,32 +139,23 @@ async def update_phone(
             detail="Phone number cannot be empty"
         )
     
-    # Get user from database
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Update phone number
-    user.phone = phone_data.phone.strip()
-    user.updated_at = datetime.utcnow()
+    current_user.phone = phone_data.phone.strip()
+    current_user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Phone number updated successfully",
-        "phone": user.phone
+        "phone": current_user.phone
     }
 
 
-@router.post("/update-address")
+@router.post("/update-address", response_model=AddressUpdated)
 async def update_address(
     address_data: UpdateAddressRequest,
     current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user's address"""
     
@@ -183,22 +166,13 @@ async def update_address(
             detail="Address cannot be empty"
         )
     
-    # Get user from database
-    user = db.query(Employee).filter(Employee.id == current_user.id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Update address
-    user.address = address_data.address.strip()
-    user.updated_at = datetime.utcnow()
+    current_user.address = address_data.address.strip()
+    current_user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Address updated successfully",
-        "address": user.address
+        "address": current_user.address
     }
\ No newline at end of file
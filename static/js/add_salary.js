@@ -22,14 +22,13 @@ async function loadEmployeeInfo() {
     document.getElementById('employee_id').value = employeeId;
 
     try {
-        const response = await fetch('/admin/all_employees', {
+        const response = await fetch(`/admin/employees/${employeeId}`, {
             method: 'GET',
             credentials: 'include'
         });
 
-        if (response.ok) {
-            const employees = await response.json();
-            const employee = employees.find(emp => emp.id == employeeId);
+        if (response.ok || response.status === 404) {
+            const employee = response.ok ? await response.json() : null;
             
             if (employee) {
                 document.getElementById('employeeInfo').textContent = 
@@ -78,7 +77,11 @@ document.getElementById('salaryForm').addEventListener('submit', async function(
         const result = await response.json();
 
         if (response.ok) {
-            alert('Salary added successfully!');
+            if (result.attendance_deduction > 0) {
+                alert(`Salary added successfully! Attendance deduction: ${result.attendance_deduction.toFixed(2)}, net salary: ${result.net_salary.toFixed(2)}`);
+            } else {
+                alert('Salary added successfully!');
+            }
             goBack();
         } else {
             alert(result.detail || 'Failed to add salary');
@@ -0,0 +1,45 @@
+// Helpers for the paginated admin list endpoints.
+// They answer with { items: [...], next_cursor: "..." | null, limit: n }.
+
+// Fetch one page; params with empty values are left out of the query string
+async function fetchPage(url, params = {}) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            query.append(key, value);
+        }
+    });
+
+    const queryString = query.toString();
+    const response = await fetch(queryString ? `${url}?${queryString}` : url, {
+        method: 'GET',
+        credentials: 'include'
+    });
+
+    if (response.status === 401) {
+        window.location.href = '/auth/login-page';
+        throw new Error('Not authenticated');
+    }
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return response.json();
+}
+
+// Show a "Load more" button under `element` while there is a next page
+function renderLoadMore(element, nextCursor, onLoadMore) {
+    let button = document.getElementById('loadMoreBtn');
+
+    if (!button) {
+        button = document.createElement('button');
+        button.id = 'loadMoreBtn';
+        button.className = 'load-more-btn';
+        button.textContent = 'Load more';
+        element.insertAdjacentElement('afterend', button);
+    }
+
+    button.style.display = nextCursor ? 'block' : 'none';
+    button.onclick = () => onLoadMore(nextCursor);
+}
@@ -16,25 +16,15 @@ function updateCurrentDate() {
     document.getElementById('currentDate').textContent = today.toLocaleDateString('en-US', options);
 }
 
-// Load employees from backend
-async function loadEmployees() {
-    try {
-        const response = await fetch('/admin/all_employees', {
-            method: 'GET',
-            credentials: 'include'
-        });
-
-        if (response.status === 401) {
-            window.location.href = '/auth/login-page';
-            return;
-        }
+// Only the columns this page shows
+const EMPLOYEE_FIELDS = 'id,employee_id,first_name,last_name,department_id,role';
 
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const employees = await response.json();
-        displayEmployees(employees);
+// Load employees from backend, one page at a time
+async function loadEmployees(after = null) {
+    try {
+        const data = await fetchPage('/admin/all_employees', { after, fields: EMPLOYEE_FIELDS });
+        displayEmployees(data.items, after !== null);
+        renderLoadMore(document.querySelector('.attendance-table'), data.next_cursor, loadEmployees);
         
     } catch (error) {
         console.error('Error loading employees:', error);
@@ -42,12 +32,15 @@ async function loadEmployees() {
     }
 }
 
-// Display employees in table
-function displayEmployees(employees) {
+// Display employees in table (append adds a further page below the current rows)
+function displayEmployees(employees, append = false) {
     const tbody = document.getElementById('attendanceTableBody');
-    tbody.innerHTML = '';
+    if (!append) {
+        tbody.innerHTML = '';
+    }
+    const offset = tbody.children.length;
 
-    if (employees.length === 0) {
+    if (employees.length === 0 && !append) {
         tbody.innerHTML = '<tr><td colspan="6" style="text-align: center;">No employees found</td></tr>';
         return;
     }
@@ -55,7 +48,7 @@ function displayEmployees(employees) {
     employees.forEach((employee, index) => {
         const row = document.createElement('tr');
         row.innerHTML = `
-            <td>${index + 1}</td>
+            <td>${offset + index + 1}</td>
             <td>${employee.employee_id || 'N/A'}</td>
             <td>${employee.first_name} ${employee.last_name}</td>
             <td>${employee.department_id || 'N/A'}</td>
@@ -72,32 +65,82 @@ function displayEmployees(employees) {
     });
 }
 
+// Send attendance marks as one bulk request: [{ employee_id, status }, ...]
+async function submitAttendance(records) {
+    const response = await fetch('/admin/attendance/bulk', {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ records })
+    });
+
+    if (response.status === 401) {
+        window.location.href = '/auth/login-page';
+        throw new Error('Not authenticated');
+    }
+
+    const result = await response.json();
+    if (!response.ok) {
+        throw new Error(result.detail || 'Failed to mark attendance');
+    }
+
+    // per-row results; highlight every row that was written
+    result.results.forEach(row => {
+        if (row.result !== 'failed') {
+            updateButtonStates(row.employee_id, row.status);
+        }
+    });
+    return result;
+}
+
 // Mark attendance for employee
 async function markAttendance(employeeId, status) {
     try {
-        const formData = new FormData();
-        formData.append('employee_id', employeeId);
-        formData.append('status', status);
-
-        const response = await fetch('/admin/update_attendance', {
-            method: 'POST',
-            credentials: 'include',
-            body: formData
-        });
+        const result = await submitAttendance([{ employee_id: employeeId, status }]);
+        const row = result.results[0];
 
-        const result = await response.json();
-
-        if (response.ok) {
+        if (row.result !== 'failed') {
             showSuccess(`Attendance marked as ${status.toUpperCase()} successfully!`);
-            // Update the button states for this employee
-            updateButtonStates(employeeId, status);
         } else {
-            showError(result.detail || 'Failed to mark attendance');
+            showError(row.detail || 'Failed to mark attendance');
         }
         
     } catch (error) {
         console.error('Error marking attendance:', error);
-        showError('Failed to mark attendance');
+        showError(error.message || 'Failed to mark attendance');
+    }
+}
+
+// Mark every employee currently shown (search filter applied) with one request
+async function markAllVisible(status) {
+    const records = [];
+    document.querySelectorAll('#attendanceTableBody tr').forEach(row => {
+        const cells = row.getElementsByTagName('td');
+        if (cells.length > 1 && row.style.display !== 'none') {
+            records.push({ employee_id: cells[1].textContent, status });
+        }
+    });
+
+    if (records.length === 0) {
+        showError('No employees to mark');
+        return;
+    }
+    if (!confirm(`Mark ${records.length} employees as ${status.toUpperCase()}?`)) {
+        return;
+    }
+
+    try {
+        const result = await submitAttendance(records);
+        let message = `Marked ${result.recorded + result.updated} employees as ${status.toUpperCase()}.`;
+        if (result.failed > 0) {
+            message += ` ${result.failed} failed.`;
+        }
+        showSuccess(message);
+    } catch (error) {
+        console.error('Error marking attendance:', error);
+        showError(error.message || 'Failed to mark attendance');
     }
 }
 
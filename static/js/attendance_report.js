@@ -13,10 +13,50 @@ function setDefaultDates() {
     document.getElementById('startDate').value = thirtyDaysAgo.toISOString().split('T')[0];
 }
 
+// Table columns per grouping: [header, function(row) -> cell html]
+const COUNT_COLUMNS = [
+    ['Present', row => row.present],
+    ['Absent', row => row.absent],
+    ['Late', row => row.late],
+    ['Total', row => row.total],
+    ['Present %', row => formatRate(row.present_rate)]
+];
+
+const REPORT_COLUMNS = {
+    employee: [
+        ['Employee ID', row => row.employee_id],
+        ['Employee Name', row => row.employee_name],
+        ['Department', row => row.department_id || 'N/A'],
+        ...COUNT_COLUMNS
+    ],
+    department: [
+        ['Department', row => row.department_name || 'No Department'],
+        ...COUNT_COLUMNS
+    ],
+    day: [
+        ['Date', row => formatDate(row.date)],
+        ...COUNT_COLUMNS
+    ],
+    week: [
+        ['Week Of', row => formatDate(row.week_start)],
+        ...COUNT_COLUMNS
+    ],
+    none: [
+        ['Employee ID', row => row.employee_id],
+        ['Employee Name', row => row.employee_name],
+        ['Department', row => row.department_id || 'N/A'],
+        ['Date', row => formatDate(row.date)],
+        ['Status', row => `<span class="status-${row.status}">${row.status.toUpperCase()}</span>`]
+    ]
+};
+
+let rowCount = 0;
+
 // Generate attendance report
-async function generateReport() {
+async function generateReport(after = null) {
     const startDate = document.getElementById('startDate').value;
     const endDate = document.getElementById('endDate').value;
+    const groupBy = document.getElementById('groupBy').value;
     
     if (!startDate || !endDate) {
         alert('Please select both start and end dates');
@@ -29,26 +69,20 @@ async function generateReport() {
     }
     
     try {
-        // Show loading state
-        document.getElementById('reportSummary').textContent = 'Loading report...';
-        document.getElementById('reportTableBody').innerHTML = '<tr><td colspan="6" class="loading">Loading attendance data...</td></tr>';
+        if (!after) {
+            // Show loading state
+            renderHeader(groupBy);
+            document.getElementById('reportSummary').textContent = 'Loading report...';
+            document.getElementById('reportTableBody').innerHTML = `<tr><td colspan="${columnCount(groupBy)}" class="loading">Loading attendance data...</td></tr>`;
+        }
         
-        const response = await fetch(`/admin/attendance_report?start_date=${startDate}&end_date=${endDate}`, {
-            method: 'GET',
-            credentials: 'include'
+        const reportData = await fetchPage('/admin/attendance_report', {
+            start_date: startDate,
+            end_date: endDate,
+            group_by: groupBy,
+            after
         });
-
-        if (response.status === 401) {
-            window.location.href = '/auth/login-page';
-            return;
-        }
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const reportData = await response.json();
-        displayReport(reportData);
+        displayReport(reportData, Boolean(after));
         
     } catch (error) {
         console.error('Error generating report:', error);
@@ -56,32 +90,51 @@ async function generateReport() {
     }
 }
 
-// Display report data
-function displayReport(reportData) {
+function columnCount(groupBy) {
+    return REPORT_COLUMNS[groupBy].length + 1;
+}
+
+function renderHeader(groupBy) {
+    const header = document.getElementById('reportTableHead');
+    header.innerHTML = '<th>S.No</th>' + REPORT_COLUMNS[groupBy].map(([title]) => `<th>${title}</th>`).join('');
+}
+
+// Display report data; individual records come a page at a time and are appended
+function displayReport(reportData, append) {
     const tbody = document.getElementById('reportTableBody');
-    tbody.innerHTML = '';
+    const groupBy = reportData.group_by;
+    const rows = groupBy === 'none' ? reportData.items : reportData.groups;
+    
+    if (!append) {
+        tbody.innerHTML = '';
+        rowCount = 0;
+    }
     
     // Update summary
-    document.getElementById('reportSummary').textContent = 
-        `Report from ${formatDate(reportData.start_date)} to ${formatDate(reportData.end_date)} - Total Records: ${reportData.total_records}`;
+    let summary = `Report from ${formatDate(reportData.start_date)} to ${formatDate(reportData.end_date)}`;
+    if (reportData.summary) {
+        const totals = reportData.summary;
+        summary += ` - Records: ${totals.total}, Present: ${totals.present} (${formatRate(totals.present_rate)}), ` +
+            `Absent: ${totals.absent} (${formatRate(totals.absent_rate)}), Late: ${totals.late} (${formatRate(totals.late_rate)})`;
+    }
+    document.getElementById('reportSummary').textContent = summary;
     
-    if (reportData.attendance_data.length === 0) {
-        tbody.innerHTML = '<tr><td colspan="6" class="empty-state">No attendance records found for the selected date range</td></tr>';
-        return;
+    if (!append && rows.length === 0) {
+        tbody.innerHTML = `<tr><td colspan="${columnCount(groupBy)}" class="empty-state">No attendance records found for the selected date range</td></tr>`;
     }
 
-    reportData.attendance_data.forEach((record, index) => {
+    rows.forEach(record => {
+        rowCount += 1;
         const row = document.createElement('tr');
-        row.innerHTML = `
-            <td>${index + 1}</td>
-            <td>${record.employee_id}</td>
-            <td>${record.employee_name}</td>
-            <td>${record.department_id || 'N/A'}</td>
-            <td>${formatDate(record.date)}</td>
-            <td><span class="status-${record.status}">${record.status.toUpperCase()}</span></td>
-        `;
+        row.innerHTML = `<td>${rowCount}</td>` + REPORT_COLUMNS[groupBy].map(([, cell]) => `<td>${cell(record)}</td>`).join('');
         tbody.appendChild(row);
     });
+    
+    renderLoadMore(document.querySelector('.report-table'), groupBy === 'none' ? reportData.next_cursor : null, generateReport);
+}
+
+function formatRate(rate) {
+    return `${(rate * 100).toFixed(1)}%`;
 }
 
 // Format date for display
@@ -100,10 +153,17 @@ function exportReport() {
     const startDate = document.getElementById('startDate').value;
     const endDate = document.getElementById('endDate').value;
     
+    // Individual records are only loaded a page at a time; stream the full range from the server
+    if (document.getElementById('groupBy').value === 'none') {
+        window.location.href = `/admin/export/attendance?start_date=${startDate}&end_date=${endDate}`;
+        return;
+    }
+    
     // Create CSV content
     let csvContent = "data:text/csv;charset=utf-8,";
     csvContent += `Attendance Report (${startDate} to ${endDate})\\n\\n`;
-    csvContent += "S.No,Employee ID,Employee Name,Department,Date,Status\\n";
+    const headers = Array.from(table.querySelectorAll('thead th')).map(th => th.textContent.trim());
+    csvContent += headers.join(',') + "\\n";
     
     const rows = table.querySelectorAll('tbody tr');
     rows.forEach(row => {
@@ -132,7 +192,7 @@ function showError(message) {
     alert(message);
     document.getElementById('reportSummary').textContent = 'Error loading report';
     document.getElementById('reportTableBody').innerHTML = 
-        `<tr><td colspan="6" class="empty-state">${message}</td></tr>`;
+        `<tr><td colspan="${columnCount(document.getElementById('groupBy').value)}" class="empty-state">${message}</td></tr>`;
 }
 
 function goBack() {
@@ -23,7 +23,7 @@ async function loadDepartmentEmployees() {
     document.getElementById('departmentSubtitle').textContent = `Team members in ${departmentName} department`;
     
     try {
-        const response = await fetch(`/admin/department/${encodeURIComponent(departmentName)}/employees`, {
+        const response = await fetch(`/admin/department/${encodeURIComponent(departmentName)}/employees?fields=id,employee_id,first_name,last_name,email,phone,role,is_active`, {
             method: 'GET',
             credentials: 'include'
         });
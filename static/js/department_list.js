@@ -3,10 +3,10 @@ document.addEventListener('DOMContentLoaded', function() {
     loadDepartments();
 });
 
-// Load departments from backend
+// Load departments (with their headcounts) from backend
 async function loadDepartments() {
     try {
-        const response = await fetch('/admin/all_departments', {
+        const response = await fetch('/admin/departments/headcount', {
             method: 'GET',
             credentials: 'include'
         });
@@ -35,7 +35,7 @@ function displayDepartments(departments) {
     tbody.innerHTML = '';
 
     if (departments.length === 0) {
-        tbody.innerHTML = '<tr><td colspan="4" style="text-align: center;">No departments found</td></tr>';
+        tbody.innerHTML = '<tr><td colspan="5" style="text-align: center;">No departments found</td></tr>';
         return;
     }
 
@@ -43,8 +43,9 @@ function displayDepartments(departments) {
         const row = document.createElement('tr');
         row.innerHTML = `
             <td>${index + 1}</td>
-            <td>${department.id}</td>
+            <td>${department.department_id}</td>
             <td>${department.department_name}</td>
+            <td>${department.active_employees} / ${department.employees}</td>
             <td>
                 <button class="view-btn" onclick="viewDepartment('${department.department_name}')">View</button>
             </td>
@@ -3,25 +3,15 @@ document.addEventListener('DOMContentLoaded', function() {
     loadEmployees();
 });
 
-// Load employees from backend
-async function loadEmployees() {
-    try {
-        const response = await fetch('/admin/all_employees', {
-            method: 'GET',
-            credentials: 'include'
-        });
-
-        if (response.status === 401) {
-            window.location.href = '/auth/login-page';
-            return;
-        }
+// Only the columns this page shows
+const EMPLOYEE_FIELDS = 'id,employee_id,first_name,last_name,department_id,phone,address';
 
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const employees = await response.json();
-        displayEmployees(employees);
+// Load employees from backend, one page at a time
+async function loadEmployees(after = null) {
+    try {
+        const data = await fetchPage('/admin/all_employees', { after, fields: EMPLOYEE_FIELDS });
+        displayEmployees(data.items, after !== null);
+        renderLoadMore(document.querySelector('.employee-table'), data.next_cursor, loadEmployees);
         
     } catch (error) {
         console.error('Error loading employees:', error);
@@ -29,12 +19,15 @@ async function loadEmployees() {
     }
 }
 
-// Display employees in table
-function displayEmployees(employees) {
+// Display employees in table (append adds a further page below the current rows)
+function displayEmployees(employees, append = false) {
     const tbody = document.getElementById('employeeTableBody');
-    tbody.innerHTML = '';
+    if (!append) {
+        tbody.innerHTML = '';
+    }
+    const offset = tbody.children.length;
 
-    if (employees.length === 0) {
+    if (employees.length === 0 && !append) {
         tbody.innerHTML = '<tr><td colspan="7" style="text-align: center;">No employees found</td></tr>';
         return;
     }
@@ -42,7 +35,7 @@ function displayEmployees(employees) {
     employees.forEach((employee, index) => {
         const row = document.createElement('tr');
         row.innerHTML = `
-            <td>${index + 1}</td>
+            <td>${offset + index + 1}</td>
             <td>${employee.employee_id || 'N/A'}</td>
             <td>${employee.first_name} ${employee.last_name}</td>
             <td>${employee.department_id || 'N/A'}</td>
@@ -20,7 +20,7 @@ async function loadEmployeeSalaryDetails() {
 
     try {
         // First get employee details
-        const employeeResponse = await fetch('/admin/all_employees', {
+        const employeeResponse = await fetch(`/admin/employees/${employeeId}`, {
             method: 'GET',
             credentials: 'include'
         });
@@ -30,17 +30,16 @@ async function loadEmployeeSalaryDetails() {
             return;
         }
 
+        if (employeeResponse.status === 404) {
+            showError('Employee not found');
+            return;
+        }
+
         if (!employeeResponse.ok) {
             throw new Error(`HTTP error! status: ${employeeResponse.status}`);
         }
 
-        const employees = await employeeResponse.json();
-        const employee = employees.find(emp => emp.id == employeeId);
-
-        if (!employee) {
-            showError('Employee not found');
-            return;
-        }
+        const employee = await employeeResponse.json();
 
         // Update page title with employee info
         document.getElementById('employeeTitle').textContent = `${employee.first_name} ${employee.last_name} - Salary Details`;
@@ -49,15 +48,13 @@ async function loadEmployeeSalaryDetails() {
         console.log('Employee found:', employee);
         console.log('Employee ID for salary query:', employee.employee_id);
 
-        // Load salary details
-        const salaryResponse = await fetch(`/admin/employee_fulsalary?employee_id=${employee.employee_id}`, {
+        // Load salary details (one grouped history request)
+        const historyUrl = `/admin/salary_history?employee_ids=${encodeURIComponent(employee.employee_id)}`;
+        const salaryResponse = await fetch(historyUrl, {
             method: 'GET',
             credentials: 'include'
         });
 
-        console.log('Salary API URL:', `/admin/employee_fulsalary?employee_id=${employee.employee_id}`);
-        console.log('Salary response status:', salaryResponse.status);
-
         if (salaryResponse.status === 401) {
             window.location.href = '/auth/login-page';
             return;
@@ -69,14 +66,12 @@ async function loadEmployeeSalaryDetails() {
             throw new Error(`HTTP error! status: ${salaryResponse.status}`);
         }
 
-        const contentType = salaryResponse.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-            const responseText = await salaryResponse.text();
-            console.error('Non-JSON response:', responseText);
-            throw new Error('Server returned non-JSON response');
-        }
-
-        const salaries = await salaryResponse.json();
+        // rows are arrays in the order of history.columns
+        const history = await salaryResponse.json();
+        const rows = history.items.length > 0 ? history.items[0].salaries : [];
+        const salaries = rows.map(row => Object.fromEntries(
+            history.columns.map((column, i) => [column, row[i]])
+        ));
         displaySalaries(salaries);
 
     } catch (error) {
@@ -5,35 +5,24 @@ document.addEventListener('DOMContentLoaded', function() {
     loadLeaves();
 });
 
-async function loadLeaves() {
+// Load one page of leaves; names and departments come joined in from the server
+async function loadLeaves(after = null) {
     console.log('loadLeaves() called');
     try {
-        const response = await fetch('/admin/leaves', {
-            method: 'GET',
-            credentials: 'include'
-        });
-
-        if (response.status === 401) {
-            window.location.href = '/auth/login-page';
-            return;
-        }
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const leaves = await response.json();
-        console.log('Leaves received:', leaves);
-        
-        const employeeResponse = await fetch('/admin/all_employees', {
-            method: 'GET',
-            credentials: 'include'
+        const filter = document.getElementById('statusFilter').value;
+        const data = await fetchPage('/admin/leaves', {
+            sort: 'start_date',
+            status: filter === 'all' ? null : filter,
+            include_counts: after === null ? 'true' : null,
+            after
         });
+        console.log('Leaves received:', data);
         
-        const employees = employeeResponse.ok ? await employeeResponse.json() : [];
-        console.log('Employees received:', employees);
-        
-        displayLeaves(leaves, employees);
+        if (data.counts) {
+            updateSummary(data.counts);
+        }
+        displayLeaves(data.items, after !== null);
+        renderLoadMore(document.querySelector('.leave-table'), data.next_cursor, loadLeaves);
         
     } catch (error) {
         console.error('Error loading leaves:', error);
@@ -41,34 +30,38 @@ async function loadLeaves() {
     }
 }
 
-function displayLeaves(leaves, employees) {
-    console.log('displayLeaves called with:', leaves, employees);
-    const tbody = document.getElementById('leaveTableBody');
-    tbody.innerHTML = '';
-    
-    const pendingCount = leaves.filter(leave => leave.status === 'pending').length;
+function updateSummary(counts) {
+    const total = Object.values(counts).reduce((sum, count) => sum + count, 0);
     document.getElementById('leaveSummary').textContent = 
-        `Total Applications: ${leaves.length} | Pending: ${pendingCount}`;
+        `Total Applications: ${total} | Pending: ${counts.pending || 0}`;
+}
 
-    if (leaves.length === 0) {
+function displayLeaves(leaves, append = false) {
+    console.log('displayLeaves called with:', leaves);
+    const tbody = document.getElementById('leaveTableBody');
+    if (!append) {
+        tbody.innerHTML = '';
+    }
+    const offset = tbody.children.length;
+
+    if (leaves.length === 0 && !append) {
         tbody.innerHTML = '<tr><td colspan="9" class="empty-state">No leave applications found</td></tr>';
         return;
     }
 
     leaves.forEach((leave, index) => {
-        console.log('Processing leave:', leave);
-        
-        const employee = employees.find(emp => emp.employee_id === leave.employee_id) || {};
-        console.log('Found employee:', employee);
-        
-        const employeeName = employee.first_name && employee.last_name 
-            ? `${employee.first_name} ${employee.last_name}` 
+        const employeeName = leave.first_name && leave.last_name 
+            ? `${leave.first_name} ${leave.last_name}` 
             : 'Unknown';
-        const employeeId = employee.employee_id || 'N/A';
+        const employeeId = leave.employee_id || 'N/A';
         
         const row = document.createElement('tr');
+        row.dataset.leaveId = leave.id;
         row.innerHTML = `
-            <td>${index + 1}</td>
+            <td>
+                <input type="checkbox" class="leave-select" value="${leave.id}" ${leave.status !== 'pending' ? 'disabled' : ''}>
+                ${offset + index + 1}
+            </td>
             <td>${employeeId}</td>
             <td>${employeeName}</td>
             <td>${leave.leave_type || 'N/A'}</td>
@@ -148,51 +141,93 @@ async function rejectLeave(leaveId) {
 }
 
 function updateLeaveStatus(leaveId, newStatus) {
-    const rows = document.querySelectorAll('#leaveTableBody tr');
-    rows.forEach(row => {
-        const buttons = row.querySelectorAll('button');
-        if (buttons.length >= 2) {
-            const approveBtn = buttons[0];
-            const rejectBtn = buttons[1];
-            
-            if (approveBtn.onclick && approveBtn.onclick.toString().includes(leaveId)) {
-                // Update status cell
-                const statusCell = row.cells[7];
-                statusCell.innerHTML = `<span class="status-${newStatus}">${newStatus.toUpperCase()}</span>`;
-                
-                // Disable both buttons
-                approveBtn.disabled = true;
-                rejectBtn.disabled = true;
-                
-                // Update button appearance
-                if (newStatus === 'approved') {
-                    approveBtn.textContent = 'Approved';
-                    approveBtn.style.backgroundColor = '#059669';
-                } else if (newStatus === 'rejected') {
-                    rejectBtn.textContent = 'Rejected';
-                    rejectBtn.style.backgroundColor = '#dc2626';
+    const row = document.querySelector(`#leaveTableBody tr[data-leave-id="${leaveId}"]`);
+    if (!row) {
+        return;
+    }
+
+    // Update status cell
+    const statusCell = row.cells[7];
+    statusCell.innerHTML = `<span class="status-${newStatus}">${newStatus.toUpperCase()}</span>`;
+
+    // Disable the checkbox and both buttons
+    const checkbox = row.querySelector('.leave-select');
+    checkbox.checked = false;
+    checkbox.disabled = true;
+    const approveBtn = row.querySelector('.approve-btn');
+    const rejectBtn = row.querySelector('.reject-btn');
+    approveBtn.disabled = true;
+    rejectBtn.disabled = true;
+
+    // Update button appearance
+    if (newStatus === 'approved') {
+        approveBtn.textContent = 'Approved';
+        approveBtn.style.backgroundColor = '#059669';
+    } else if (newStatus === 'rejected') {
+        rejectBtn.textContent = 'Rejected';
+        rejectBtn.style.backgroundColor = '#dc2626';
+    }
+}
+
+function toggleSelectAll(checkbox) {
+    document.querySelectorAll('.leave-select:not(:disabled)').forEach(box => {
+        box.checked = checkbox.checked;
+    });
+}
+
+// Approve or reject every checked leave with one request
+async function decideSelected(decision) {
+    const leaveIds = Array.from(document.querySelectorAll('.leave-select:checked'))
+        .map(box => parseInt(box.value));
+
+    if (leaveIds.length === 0) {
+        alert('Select at least one pending leave application');
+        return;
+    }
+    if (!confirm(`${decision === 'approve' ? 'Approve' : 'Reject'} ${leaveIds.length} leave applications?`)) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/admin/leaves/decision', {
+            method: 'POST',
+            credentials: 'include',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ leave_ids: leaveIds, decision })
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            result.changed.forEach(leaveId => updateLeaveStatus(leaveId, result.status));
+            // leaves another admin decided meanwhile show their current status
+            result.unchanged.forEach(leave => {
+                if (leave.status) {
+                    updateLeaveStatus(leave.id, leave.status);
                 }
+            });
+            document.getElementById('selectAll').checked = false;
+
+            let message = `${result.changed.length} leave applications ${result.status}.`;
+            if (result.unchanged.length > 0) {
+                message += ` ${result.unchanged.length} were no longer pending.`;
             }
+            showSuccess(message);
+        } else {
+            alert(result.detail || 'Failed to update leave applications');
         }
-    });
+
+    } catch (error) {
+        console.error('Error deciding leaves:', error);
+        alert('Failed to update leave applications');
+    }
 }
 
+// The status filter is applied by the server, so reload from the first page
 function filterByStatus() {
-    const filter = document.getElementById('statusFilter').value;
-    const rows = document.querySelectorAll('#leaveTableBody tr');
-    
-    rows.forEach(row => {
-        if (row.cells.length > 1) {
-            const statusCell = row.cells[7];
-            const status = statusCell.textContent.toLowerCase().trim();
-            
-            if (filter === 'all' || status === filter) {
-                row.style.display = '';
-            } else {
-                row.style.display = 'none';
-            }
-        }
-    });
+    loadLeaves();
 }
 
 function formatDate(dateString) {
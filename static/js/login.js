@@ -31,6 +31,10 @@ document.getElementById('loginForm').addEventListener('submit', async (e) => {
         } else if (response.status === 401) {
             errorEl.textContent = 'Invalid email or password';
             errorEl.style.display = 'block';
+        } else if (response.status === 503) {
+            const retryAfter = response.headers.get('Retry-After') || 'a few';
+            errorEl.textContent = `Server is busy. Please try again in ${retryAfter} seconds.`;
+            errorEl.style.display = 'block';
         } else {
             errorEl.textContent = 'Login failed. Please try again.';
             errorEl.style.display = 'block';
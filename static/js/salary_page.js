@@ -3,25 +3,15 @@ document.addEventListener('DOMContentLoaded', function() {
     loadEmployees();
 });
 
-// Load employees from backend
-async function loadEmployees() {
-    try {
-        const response = await fetch('/admin/all_employees', {
-            method: 'GET',
-            credentials: 'include'
-        });
-
-        if (response.status === 401) {
-            window.location.href = '/auth/login-page';
-            return;
-        }
+// Only the columns this page shows
+const EMPLOYEE_FIELDS = 'id,employee_id,first_name,last_name,department_id,role,salary';
 
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const employees = await response.json();
-        displayEmployees(employees);
+// Load employees from backend, one page at a time
+async function loadEmployees(after = null) {
+    try {
+        const data = await fetchPage('/admin/all_employees', { after, fields: EMPLOYEE_FIELDS });
+        displayEmployees(data.items, after !== null);
+        renderLoadMore(document.querySelector('.employee-table'), data.next_cursor, loadEmployees);
         
     } catch (error) {
         console.error('Error loading employees:', error);
@@ -29,12 +19,15 @@ async function loadEmployees() {
     }
 }
 
-// Display employees in table
-function displayEmployees(employees) {
+// Display employees in table (append adds a further page below the current rows)
+function displayEmployees(employees, append = false) {
     const tbody = document.getElementById('employeeTableBody');
-    tbody.innerHTML = '';
+    if (!append) {
+        tbody.innerHTML = '';
+    }
+    const offset = tbody.children.length;
 
-    if (employees.length === 0) {
+    if (employees.length === 0 && !append) {
         tbody.innerHTML = '<tr><td colspan="7" style="text-align: center;">No employees found</td></tr>';
         return;
     }
@@ -42,7 +35,7 @@ function displayEmployees(employees) {
     employees.forEach((employee, index) => {
         const row = document.createElement('tr');
         row.innerHTML = `
-            <td>${index + 1}</td>
+            <td>${offset + index + 1}</td>
             <td>${employee.employee_id || 'N/A'}</td>
             <td>${employee.first_name} ${employee.last_name}</td>
             <td>${employee.department_id || 'N/A'}</td>
@@ -68,6 +61,59 @@ function logout() {
     window.location.href = '/auth/login-page';
 }
 
+// POST a payroll run, see PayrollRun in model.py for the fields
+async function postPayroll(run) {
+    const response = await fetch('/admin/payroll/run', {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(run)
+    });
+
+    if (response.status === 401) {
+        window.location.href = '/auth/login-page';
+        throw new Error('Not authenticated');
+    }
+
+    const result = await response.json();
+    if (!response.ok) {
+        throw new Error(result.detail || 'Payroll run failed');
+    }
+    return result;
+}
+
+// Generate a month's salaries for all active employees: preview first, then write
+async function runPayroll() {
+    const month = prompt('Payroll month (YYYY-MM):', new Date().toISOString().slice(0, 7));
+    if (!month) {
+        return;
+    }
+
+    try {
+        const preview = await postPayroll({ month, scope: 'all', dry_run: true });
+        if (preview.employees === 0) {
+            showError(`Nothing to create for ${month} (${preview.skipped.length} employees skipped)`);
+            return;
+        }
+
+        const summary = `Create ${month} salaries for ${preview.employees} employees?\n` +
+            `Total basic: ${preview.totals.basic_salary}\n` +
+            `Total net: ${preview.totals.net_salary}\n` +
+            `Skipped: ${preview.skipped.length}`;
+        if (!confirm(summary)) {
+            return;
+        }
+
+        const result = await postPayroll({ month, scope: 'all' });
+        alert(`Payroll for ${month}: ${result.created} salaries created, ${result.skipped.length} skipped.`);
+    } catch (error) {
+        console.error('Error running payroll:', error);
+        showError(error.message || 'Payroll run failed');
+    }
+}
+
 function viewSalary(employeeId) {
     window.location.href = `/admin/employee-salary?id=${employeeId}`;
 }
@@ -19,7 +19,7 @@ async function loadEmployeeDetails() {
     }
     
     try {
-        const response = await fetch(`/admin/all_employees`, {
+        const response = await fetch(`/admin/employees/${employeeId}`, {
             method: 'GET',
             credentials: 'include'
         });
@@ -29,17 +29,16 @@ async function loadEmployeeDetails() {
             return;
         }
 
+        if (response.status === 404) {
+            showError('Employee not found');
+            return;
+        }
+
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const employees = await response.json();
-        const employee = employees.find(emp => emp.id == employeeId);
-        
-        if (!employee) {
-            showError('Employee not found');
-            return;
-        }
+        const employee = await response.json();
         
         displayEmployeeDetails(employee);
         
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# point the app at a scratch SQLite database before anything imports config
+os.environ.setdefault("EMS_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/ems_test.db")
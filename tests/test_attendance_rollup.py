@@ -0,0 +1,64 @@
+"""The attendance rollup stays equal to a recount of attendance as marks are written."""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from database import SessionLocal, SyncSessionAdapter, engine
+from migrations import run_migrations
+from model import Attendance, DailyAttendanceRollup, Department, Employee
+from router.Admin import upsert_attendance
+
+DAY = date(2026, 10, 16)
+
+
+@pytest.fixture(scope="module")
+def employees():
+    run_migrations(engine)
+    with SessionLocal() as session:
+        department = Department(department_name="Rollup")
+        session.add(department)
+        session.flush()
+        session.add_all([
+            Employee(
+                employee_id=f"ROLL{i}", first_name="R", last_name=str(i), email=f"roll{i}@ems.com",
+                password_hash="x", department_id=department.id
+            )
+            for i in (1, 2, 3)
+        ])
+        session.commit()
+    return ["ROLL1", "ROLL2", "ROLL3"]
+
+
+def write(marks):
+    with SessionLocal() as session:
+        written = asyncio.run(upsert_attendance(SyncSessionAdapter(session), marks, DAY))
+        session.commit()
+    return {employee_id: created for employee_id, (_, created) in written.items()}
+
+
+def rollup_matches_recount():
+    with SessionLocal() as session:
+        rollup = dict(session.execute(
+            select(DailyAttendanceRollup.status, func.sum(DailyAttendanceRollup.count))
+            .where(DailyAttendanceRollup.day == DAY).group_by(DailyAttendanceRollup.status)
+        ).all())
+        recount = dict(session.execute(
+            select(Attendance.status, func.count()).where(Attendance.work_day == DAY).group_by(Attendance.status)
+        ).all())
+    return {mark: count for mark, count in rollup.items() if count} == recount
+
+
+def test_marks_keep_rollup_in_step(employees):
+    assert write({"ROLL1": "present", "ROLL2": "absent"}) == {"ROLL1": True, "ROLL2": True}
+    assert rollup_matches_recount()
+    # one changed, one repeated, one new
+    assert write({"ROLL1": "late", "ROLL2": "absent", "ROLL3": "present"}) == {
+        "ROLL1": False, "ROLL2": False, "ROLL3": True
+    }
+    assert rollup_matches_recount()
+    with SessionLocal() as session:
+        assert session.scalar(select(Attendance.status).where(
+            Attendance.employee_id == "ROLL1", Attendance.work_day == DAY
+        )) == "late"
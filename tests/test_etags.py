@@ -0,0 +1,64 @@
+"""Self-service ETags follow committed writes, whichever worker made them."""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import select, update
+
+from database import SessionLocal, SyncSessionAdapter, engine
+from etags import employee_etag
+from migrations import run_migrations
+from model import Employee, Leave
+
+DAY = date(2026, 10, 18)
+
+
+@pytest.fixture(scope="module")
+def employee_id():
+    run_migrations(engine)
+    with SessionLocal() as session:
+        session.add(Employee(
+            employee_id="ETAG1", first_name="E", last_name="Tag", email="etag1@ems.com", password_hash="x"
+        ))
+        session.commit()
+    return "ETAG1"
+
+
+def etag(*tables):
+    # a fresh session per call, as a request on any worker would use
+    with SessionLocal() as session:
+        return asyncio.run(employee_etag(SyncSessionAdapter(session), "ETAG1", *tables))
+
+
+def test_committed_write_changes_etag(employee_id):
+    before = etag("leaves")
+    with SessionLocal() as session:
+        session.add(Leave(employee_id=employee_id, leave_type="annual", start_date=DAY, end_date=DAY))
+        session.commit()
+    assert etag("leaves") != before
+
+
+def test_rolled_back_write_keeps_etag(employee_id):
+    before = etag("leaves")
+    with SessionLocal() as session:
+        session.add(Leave(employee_id=employee_id, leave_type="sick", start_date=DAY, end_date=DAY))
+        session.flush()
+        session.rollback()
+    assert etag("leaves") == before
+
+
+def test_statement_without_employees_changes_every_etag(employee_id):
+    before = etag("leaves")
+    with SessionLocal() as session:
+        session.execute(update(Leave).where(Leave.status == "pending").values(status="approved"))
+        session.commit()
+    assert etag("leaves") != before
+
+
+def test_other_tables_keep_etag(employee_id):
+    before = etag("employees"), etag("salaries")
+    with SessionLocal() as session:
+        session.scalar(select(Employee).where(Employee.employee_id == employee_id)).phone = "555-0100"
+        session.commit()
+    assert etag("employees") != before[0]
+    assert etag("salaries") == before[1]
@@ -0,0 +1,38 @@
+"""Migrations bring databases created by older versions up to date."""
+from sqlalchemy import create_engine, inspect, text
+
+from database import Base
+from migrations import check_query_plans, run_migrations
+from model import Attendance
+
+# attendance as create_all made it before migration 4 (no work_day)
+LEGACY_ATTENDANCE = """
+CREATE TABLE attendance (
+    id INTEGER NOT NULL PRIMARY KEY,
+    employee_id VARCHAR(50) NOT NULL REFERENCES employees (employee_id),
+    date DATETIME NOT NULL,
+    status VARCHAR(20) NOT NULL
+)
+"""
+
+
+def test_upgrade_database_without_work_day(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    tables = [table for table in Base.metadata.sorted_tables if table is not Attendance.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_ATTENDANCE))
+        conn.execute(text(
+            "INSERT INTO attendance (employee_id, date, status) VALUES "
+            "('E1', '2026-10-01 09:00:00', 'late'), ('E1', '2026-10-01 17:00:00', 'present')"
+        ))
+
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT employee_id, work_day, status FROM attendance")).all() == [
+            ("E1", "2026-10-01", "present")
+        ]
+        indexes = {index["name"] for index in inspect(conn).get_indexes("attendance")}
+    assert {"ux_attendance_employee_work_day", "ix_attendance_work_day_status"} <= indexes
+    assert check_query_plans(engine)
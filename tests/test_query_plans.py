@@ -0,0 +1,86 @@
+"""EXPLAIN QUERY PLAN over the statements the handlers build.
+
+Each statement comes from the query builder its handler uses (keyset(),
+report_query(), marks_query(), leave_listing(), dashboard_query()), with
+the filters and cursors of a typical request. None may scan a whole
+table.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from attendance_report import REPORT_GROUPS, marks_query, report_query
+from database import engine
+from etags import version_names, versions_query
+from migrations import run_migrations, table_scans
+from model import Attendance, Employee, Salary
+from pagination import encode_cursor, keyset
+from projection import EMPLOYEE_FIELDS, select_fields
+from router.Admin import EMPLOYEE_SORTS, LEAVE_SORTS, SALARY_SORTS, leave_listing
+from router.employee import dashboard_query
+
+TODAY = date(2026, 10, 18)
+START = TODAY - timedelta(days=30)
+
+
+def employee_page(sort, cursor_values, **filters):
+    columns = EMPLOYEE_SORTS[sort]
+    stmt = select(*select_fields(None, EMPLOYEE_FIELDS, always=columns))
+    for name, value in filters.items():
+        stmt = stmt.where(getattr(Employee, name) == value)
+    return keyset(stmt, sort, columns, encode_cursor(sort, cursor_values), 100)
+
+
+def salary_page(sort, cursor_values, employee_id=None):
+    stmt = select(Salary)
+    if employee_id:
+        stmt = stmt.where(Salary.employee_id == employee_id)
+    return keyset(stmt, sort, SALARY_SORTS[sort], encode_cursor(sort, cursor_values), 100)
+
+
+def leave_page(sort, cursor_values=None, **filters):
+    stmt, _ = leave_listing(**filters)
+    after = encode_cursor(sort, cursor_values) if cursor_values else None
+    return keyset(stmt, sort, LEAVE_SORTS[sort], after, 100)
+
+
+def marks_page(after=None, department_id=None):
+    return keyset(
+        marks_query(START, TODAY, department_id), "work_day", [Attendance.work_day, Attendance.id],
+        after, 100, descending=True
+    )
+
+
+QUERIES = [
+    ("employees page by id", employee_page("id", [100])),
+    ("employees page by employee_id", employee_page("employee_id", ["E0100"])),
+    ("employees of department", employee_page("id", [100], department_id=1)),
+    ("salaries page by id", salary_page("id", [100])),
+    ("salaries page by month", salary_page("month", ["2026-01", 100])),
+    ("salaries of employee", salary_page("id", [100], employee_id="E1")),
+    ("pending leave queue", leave_page("start_date", status_filter="pending")),
+    ("pending leave queue, next page", leave_page("start_date", [TODAY, 100], status_filter="pending")),
+    ("leaves of employee", leave_page("id", employee_id="E1")),
+    ("leaves overlapping a range", leave_page("start_date", from_date=START, to_date=TODAY)),
+    ("attendance marks", marks_page()),
+    ("attendance marks, next page", marks_page(encode_cursor("work_day", [TODAY, 100]))),
+    ("attendance marks of department", marks_page(department_id=1)),
+    *[(f"attendance report by {group}", report_query(group, START, TODAY)) for group in REPORT_GROUPS],
+    *[(f"attendance report by {group}, one department", report_query(group, START, TODAY, 1)) for group in REPORT_GROUPS],
+    ("employee dashboard", dashboard_query("E1", TODAY)),
+    ("self-service etag", versions_query(version_names("E1", "leaves"))),
+]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    assert engine.dialect.name == "sqlite", "EXPLAIN QUERY PLAN check needs SQLite"
+    run_migrations(engine)
+    with engine.connect() as conn:
+        yield conn
+
+
+@pytest.mark.parametrize("name, statement", QUERIES, ids=[name for name, _ in QUERIES])
+def test_no_table_scan(conn, name, statement):
+    assert table_scans(conn, [(name, statement)]) == []